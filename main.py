@@ -4,88 +4,376 @@ import datetime
 from discord.ext import tasks
 from discord import app_commands
 from discord.ui import View, Button, Modal, TextInput, Select
+from sortedcontainers import SortedList
 import logging
 from datetime import time
 import os
 import asyncio
+import time as tm
+from concurrent.futures import ThreadPoolExecutor
+import signal
+import contextlib
+import functools
+from aiohttp import web
+import heapq
+import itertools
+from zoneinfo import ZoneInfo
+import sqlite3
+from collections import OrderedDict, deque
+import csv
+import io
+import sys
+import argparse
+import tempfile
+import hashlib
+import gzip
+import re
+import operator
+import zlib
+from array import array
+import socket
+import multiprocessing
 NOTIFY_USER_ID = int(os.getenv('NOTIFY_USER_ID', 0))  # Fallback to 0 (invalid) if not set
 
-
-# --- Add VotingView and VoteButton classes here ---
-
-# Update VotingView and VoteButton to accept display_name:
+# ------- METRICS -------
+# Every command, modal and component callback is wrapped with @instrumented, which records a
+# latency histogram and error count per handler and counts runs that overran Discord's
+# 3-second interaction deadline. Storage calls (run_io), scheduled phases and event-loop lag
+# are recorded in the same registry, which serve_metrics exposes in Prometheus text format
+# on METRICS_HOST:METRICS_PORT/metrics.
+
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9108))
+INTERACTION_DEADLINE = 3.0
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 3.0, 5.0, 10.0)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.total += 1
+        self.sum += value
+        for i, le in enumerate(self.buckets):
+            if value <= le:
+                self.counts[i] += 1
+
+METRIC_LABELS = {
+    "qotd_handler_seconds": "handler",
+    "qotd_handler_errors_total": "handler",
+    "qotd_handler_deadline_exceeded_total": "handler",
+    "qotd_storage_seconds": "op",
+    "qotd_send_wait_seconds": "lane",
+}
+
+class Metrics:
+    def __init__(self):
+        self.histograms = {}  # (metric, label value) -> Histogram
+        self.counters = {}  # (metric, label value) -> int
+        self.gauges = {}  # metric -> value
+
+    def observe(self, metric, label, value):
+        # label is None for unlabelled metrics
+        key = (metric, label)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram()
+        self.histograms[key].observe(value)
+
+    def inc(self, metric, label, amount=1):
+        self.counters[(metric, label)] = self.counters.get((metric, label), 0) + amount
+
+    def set(self, metric, value):
+        self.gauges[metric] = value
+
+    def render(self):
+        lines = []
+        seen = set()
+
+        def header(metric, kind):
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} {kind}")
+
+        def labels(metric, label, extra=""):
+            pairs = [f'{METRIC_LABELS[metric]}="{label}"'] if label is not None else []
+            if extra:
+                pairs.append(extra)
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        for (metric, label), h in sorted(self.histograms.items(), key=lambda kv: (kv[0][0], str(kv[0][1]))):
+            header(metric, "histogram")
+            for le, count in zip(h.buckets, h.counts):
+                le_label = f'le="{le}"'
+                lines.append(f"{metric}_bucket{labels(metric, label, le_label)} {count}")
+            inf_label = 'le="+Inf"'
+            lines.append(f"{metric}_bucket{labels(metric, label, inf_label)} {h.total}")
+            lines.append(f"{metric}_sum{labels(metric, label)} {h.sum}")
+            lines.append(f"{metric}_count{labels(metric, label)} {h.total}")
+        for (metric, label), value in sorted(self.counters.items()):
+            header(metric, "counter")
+            lines.append(f"{metric}{labels(metric, label)} {value}")
+        for metric, value in sorted(self.gauges.items()):
+            header(metric, "gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+@contextlib.asynccontextmanager
+async def track(name):
+    start = tm.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.inc("qotd_handler_errors_total", name)
+        raise
+    finally:
+        elapsed = tm.perf_counter() - start
+        metrics.observe("qotd_handler_seconds", name, elapsed)
+        if elapsed > INTERACTION_DEADLINE:
+            metrics.inc("qotd_handler_deadline_exceeded_total", name)
+
+def instrumented(name):
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with track(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+async def serve_metrics():
+    async def handle(request):
+        return web.Response(text=metrics.render(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+    print(f"📈 Metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    return runner
+
+
+# ------- VOTING -------
+# The voting message only shows the current leaders and an "Open ballot" button. The ballot
+# is ephemeral: BALLOT_PAGE_SIZE answers per page as an embed, a select menu to vote and
+# prev/next buttons, so any number of answers stays within Discord's 25-component and
+# message-size limits. Votes are kept as {answer index: count} and {voter: answer index};
+# page embeds are cached and only rebuilt after a vote touches that page.
+
+VOTE_RENDER_INTERVAL = float(os.getenv('VOTE_RENDER_INTERVAL', 2))
+BALLOT_PAGE_SIZE = 10
+BALLOT_TIMEOUT = 600
+ANSWER_PREVIEW = 300
+
+def preview(text, limit=ANSWER_PREVIEW):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def plural_votes(count):
+    return f"{count} vote{'s' if count != 1 else ''}"
 
 class VotingView(View):
-    def __init__(self, answers):  # answers: list of (uid, display_name, answer)
+    def __init__(self, ballot, round):  # ballot: list of (uid, answer) in posting order
         super().__init__(timeout=None)
-        self.answers = answers
-        self.vote_counts = {uid: 0 for uid, _, _ in answers}
-        self.user_votes = {}
-
-        for idx, (uid, display_name, _) in enumerate(answers):
-            label = f"Vote for answer #{idx+1} ({display_name})"
-            self.add_item(VoteButton(label=label, uid=uid, parent=self))
+        # Parallel arrays rather than a tuple per answer; names are looked up when a page renders
+        self.uids = array('Q', (int(uid) for uid, _ in ballot))
+        self.answers = [answer for _, answer in ballot]
+        self.round = round
+        self.vote_counts = array('I', [0]) * len(self.answers)  # answer index -> votes
+        self.user_votes = {}  # voter id -> answer index
+        self.page_versions = {}  # page -> bumped on every vote that changes a count on it
+        self.page_cache = {}  # page -> (version, embed)
+        self.option_cache = {}  # page -> select options; answers don't change once voting opens
+        self.closed = False
+        # Votes only mark the tally dirty; render_loop edits the message at most once per VOTE_RENDER_INTERVAL
+        self.message = None
+        self.dirty = False
+        self.render_task = None
+        self.add_item(OpenBallotButton())
+
+    @property
+    def page_count(self):
+        return max(1, -(-len(self.answers) // BALLOT_PAGE_SIZE))
+
+    def entries(self):
+        # The ballot as the journal records it
+        return [[str(uid), answer] for uid, answer in zip(self.uids, self.answers)]
+
+    def name(self, idx):
+        uid = self.uids[idx]
+        record = self.round.answer_log.get(uid)
+        return member_cache.display_name(self.round.guild_id, uid, record.name if record else None)
+
+    def cast(self, voter, idx):
+        # -> error message, or None once the vote is counted
+        if self.uids[idx] == voter:
+            return "❌ You cannot vote for your own answer."
+        previous = self.user_votes.get(voter)
+        if previous == idx:
+            return "You already voted for this answer."
+        if previous is not None:
+            self.vote_counts[previous] -= 1
+            self.touch(previous)
+        self.user_votes[voter] = idx
+        self.vote_counts[idx] += 1
+        self.touch(idx)
+
+    def touch(self, idx):
+        page = idx // BALLOT_PAGE_SIZE
+        self.page_versions[page] = self.page_versions.get(page, 0) + 1
+
+    def tally(self):
+        # -> {uid: votes} for every answer with at least one vote; string ids, as the store keys them
+        return {str(self.uids[idx]): count for idx, count in enumerate(self.vote_counts) if count}
+
+    def page_options(self, page):
+        if page not in self.option_cache:
+            self.option_cache[page] = [
+                discord.SelectOption(label=f"Answer #{idx+1} ({self.name(idx)})"[:100], description=preview(self.answers[idx], 100), value=str(idx))
+                for idx in range(page * BALLOT_PAGE_SIZE, min((page + 1) * BALLOT_PAGE_SIZE, len(self.answers)))
+            ]
+        return self.option_cache[page]
+
+    def page_embed(self, page):
+        version = self.page_versions.get(page, 0)
+        cached = self.page_cache.get(page)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        lines = []
+        for idx in range(page * BALLOT_PAGE_SIZE, min((page + 1) * BALLOT_PAGE_SIZE, len(self.answers))):
+            lines.append(f"**Answer #{idx+1} ({self.name(idx)})** — {plural_votes(self.vote_counts[idx])}\n{preview(self.answers[idx])}")
+        embed = discord.Embed(title="Vote for the best answer!", description="\n\n".join(lines))
+        embed.set_footer(text=f"Page {page+1}/{self.page_count} · {len(self.answers)} answers")
+        self.page_cache[page] = (version, embed)
+        return embed
+
+    def render(self):
+        # Public tally: the leading answers, ties in posting order
+        leaders = sorted(range(len(self.answers)), key=lambda idx: -self.vote_counts[idx])[:BALLOT_PAGE_SIZE]
+        lines = []
+        for idx in leaders:
+            lines.append(f"**Answer #{idx+1} ({self.name(idx)})** — {plural_votes(self.vote_counts[idx])}\n{preview(self.answers[idx], 150)}")
+        title = "Final votes" if self.closed else "Current votes"
+        embed = discord.Embed(title=title, description="\n\n".join(lines))
+        embed.set_footer(text=f"{len(self.answers)} answers · {plural_votes(len(self.user_votes))}")
+        return embed
+
+    def schedule_render(self):
+        self.dirty = True
+        if self.message and (self.render_task is None or self.render_task.done()):
+            self.render_task = asyncio.create_task(self.render_loop())
+
+    async def render_loop(self):
+        while self.dirty:
+            await asyncio.sleep(VOTE_RENDER_INTERVAL)
+            self.dirty = False
+            try:
+                await self.message.edit(embed=self.render(), view=self)
+            except discord.HTTPException as e:
+                print(f"⚠️ Could not update vote tally: {e}")
+
+    def cancel_render(self):
+        if self.render_task and not self.render_task.done():
+            self.render_task.cancel()
+        self.dirty = False
+
+    def close(self):
+        self.cancel_render()
+        self.closed = True
+        for child in self.children:
+            child.disabled = True
 
-class VoteButton(Button):
-    def __init__(self, label, uid, parent):
-        super().__init__(label=label, style=discord.ButtonStyle.primary)
-        self.uid = uid
-        self.parent = parent
+class OpenBallotButton(Button):
+    def __init__(self):
+        super().__init__(label="🗳️ Open ballot", style=discord.ButtonStyle.primary, custom_id="qotd:ballot:open")
 
+    @instrumented("OpenBallotButton.callback")
     async def callback(self, interaction: discord.Interaction):
-        user_id = str(interaction.user.id)
-        parent = self.parent
-
-        if user_id == str(self.uid):
-            await interaction.response.send_message("❌ You cannot vote for your own answer.", ephemeral=True)
+        voting = self.view
+        if voting.closed:
+            await interaction.response.send_message("Voting has ended.", ephemeral=True)
             return
+        # Open on the page holding the member's current vote, if any
+        page = voting.user_votes.get(interaction.user.id, 0) // BALLOT_PAGE_SIZE
+        await interaction.response.send_message(embed=voting.page_embed(page), view=BallotView(voting, page), ephemeral=True)
+
+class BallotView(View):
+    def __init__(self, voting, page):
+        super().__init__(timeout=BALLOT_TIMEOUT)
+        self.voting = voting
+        self.page = page
+        self.add_item(BallotSelect(voting, page))
+        if voting.page_count > 1:
+            self.add_item(BallotPageButton("◀ Previous", page - 1, disabled=page == 0))
+            self.add_item(BallotPageButton("Next ▶", page + 1, disabled=page >= voting.page_count - 1))
+
+class BallotPageButton(Button):
+    def __init__(self, label, page, disabled):
+        super().__init__(label=label, style=discord.ButtonStyle.secondary, disabled=disabled)
+        self.page = page
 
-        if user_id in parent.user_votes:
-            previous_vote = parent.user_votes[user_id]
-            if previous_vote == self.uid:
-                await interaction.response.send_message("You already voted for this answer.", ephemeral=True)
-                return
-            else:
-                parent.vote_counts[previous_vote] -= 1
+    @instrumented("BallotPageButton.callback")
+    async def callback(self, interaction: discord.Interaction):
+        voting = self.view.voting
+        await interaction.response.edit_message(embed=voting.page_embed(self.page), view=BallotView(voting, self.page))
 
-        parent.user_votes[user_id] = self.uid
-        parent.vote_counts[self.uid] += 1
+class BallotSelect(Select):
+    def __init__(self, voting, page):
+        super().__init__(placeholder="Pick the best answer on this page", options=voting.page_options(page))
 
-        desc_lines = []
-        for idx, (uid, display_name, answer) in enumerate(parent.answers, start=1):
-            count = parent.vote_counts.get(uid, 0)
-            desc_lines.append(f"Answer #{idx} ({display_name}): {answer} — {count} vote{'s' if count != 1 else ''}")
+    @instrumented("BallotSelect.callback")
+    async def callback(self, interaction: discord.Interaction):
+        ballot = self.view
+        voting = ballot.voting
+        if voting.closed:
+            await interaction.response.send_message("Voting has ended.", ephemeral=True)
+            return
+
+        voter = interaction.user.id
+        idx = int(self.values[0])
+        error = voting.cast(voter, idx)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
+            return
 
-        vote_summary = "\n".join(desc_lines)
-        await interaction.response.edit_message(content=f"Current votes:\n{vote_summary}", view=parent)
+        await interaction.response.edit_message(
+            content=f"✅ Your vote for answer #{idx+1} is in. You can change it until voting closes.",
+            embed=voting.page_embed(ballot.page),
+            view=BallotView(voting, ballot.page),
+        )
+        voting.schedule_render()
+        await voting.round.journal({"t": "vote", "voter": str(voter), "idx": idx})
 
 
 logging.basicConfig(level=logging.INFO)
 print("💡 main.py is running")
 
 TOKEN = os.getenv('DISCORD_BOT_TOKEN')
-if not TOKEN:
-    raise RuntimeError("❌ DISCORD_BOT_TOKEN not set!")
-CHANNEL_ID = int(os.getenv('DISCORD_CHANNEL_ID'))
+# Single-guild settings from the environment seed guilds.json on first start; further guilds are added with /qotdsetup
+GUILD_ID = int(os.getenv('GUILD_ID', 0))
+CHANNEL_ID = int(os.getenv('DISCORD_CHANNEL_ID', 0))
 ADMIN_CHANNEL_ID = int(os.getenv('DISCORD_ADMIN_CHANNEL_ID', CHANNEL_ID))
-GUILD_ID = int(os.getenv('GUILD_ID'))
+DEFAULT_TIMEZONE = os.getenv('QOTD_TIMEZONE', 'UTC')
+# "gateway": interactions arrive over the gateway and are handled here. "http": Discord posts
+# them to `main.py serve-interactions` and this process only runs the schedule.
+INTERACTIONS_MODE = os.getenv('INTERACTIONS_MODE', 'gateway')
 
 QUESTIONS_FILE = 'questions.json'
 SCORES_FILE = 'user_scores.json'
 START_DATE = datetime.date(2025, 6, 25)
-# --- Voting and submission tracking ---
-submission_open = True
-voting_message = None
-voting_view = None
-current_votes = {}
-answer_log = {}  # Stores answers by user: {user_id: {"answer": ..., "user": ..., "anonymous": bool}}
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.guilds = True
-intents.members = True
-client = discord.Client(intents=intents)
-tree = app_commands.CommandTree(client)
+intents.members = False  # names come from member_cache instead of the full member list
+client = discord.AutoShardedClient(intents=intents)
+# Scores are kept per server, so commands are offered in servers only, not in DMs
+tree = app_commands.CommandTree(client, allowed_contexts=app_commands.AppCommandContext(guild=True))
 
 def load_questions():
     try:
@@ -94,20 +382,1634 @@ def load_questions():
     except:
         return []
 
+def write_json_atomic(path, data):
+    # Write to a temp file next to the target and swap it in, so a crash mid-write never leaves a truncated file
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
 def save_questions(questions):
-    with open(QUESTIONS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(questions, f, indent=2)
+    write_json_atomic(QUESTIONS_FILE, questions)
+
+# ------- STORAGE -------
+# Two interchangeable backends expose the same methods (get, record_answer, claim_contribution,
+# add_points, items, questions, question_at, question_count, get_question, next_question_after,
+# question_page, question_filter_count, add_question, remove_question, increment,
+# apply_adjustments, flush). Every score change is one call that reads and writes the user's
+# row together (one UPSERT in SQLite), so concurrent changes to the same user never lose an
+# update; handlers only need user_locks to keep a multi-call sequence together.
+# Scores and answered questions belong to a (guild, user) pair, so each server keeps its own
+# standings; the question bank is shared. Older scores move to legacy_guild_id() on first load.
+# question_version goes up on every add/remove so cached question pages can tell they are stale. Removed questions are only marked "removed", so
+# question IDs are never reused.
+# STORAGE_BACKEND=sqlite is the production engine; json keeps the original flat files.
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'sqlite')
+DB_FILE = os.getenv('DB_FILE', 'qotd.db')
+SCORES_FLUSH_SECONDS = int(os.getenv('SCORES_FLUSH_SECONDS', 10))
+
+def new_score():
+    return {"insight_points": 0, "contribution_points": 0, "answered": [], "last_contrib": None}
+
+def legacy_guild_id():
+    # The guild the bot served alone before scores were kept per guild
+    if GUILD_ID:
+        return str(GUILD_ID)
+    try:
+        with open(GUILDS_FILE, 'r', encoding='utf-8') as f:
+            guilds = list(json.load(f))
+    except:
+        guilds = []
+    return guilds[0] if len(guilds) == 1 else "0"
+
+class JsonStore:
+    # Scores are loaded once and kept in memory; point changes only mark the store dirty
+    # and flush_scores writes them out in one batch every SCORES_FLUSH_SECONDS (and on shutdown).
+    # The file maps guild id -> uid -> score; an older flat {uid: score} file is filed under legacy_guild_id().
+    def __init__(self, scores_path):
+        self.path = scores_path
+        self.scores = {}
+        self.answered = {}  # (guild_id, uid) -> set of qids, mirrors the score's "answered" for O(1) lookups
+        self.question_list = []
+        self.question_index = {}  # int id -> question
+        self.active_ids = SortedList()
+        self.all_ids = SortedList()
+        self.by_submitter = {}  # submitter -> SortedList of ids
+        self.question_version = 0
+        self.next_qid = 1
+        self.loaded = False
+        self.dirty = False
+        self.questions_dirty = False
+        self.on_change = None  # called as on_change(guild_id, uid, insight_points, contribution_points)
+
+    def load(self):
+        if self.loaded:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.scores = json.load(f)
+        except:
+            self.scores = {}
+        if any("insight_points" in s for s in self.scores.values()):
+            self.scores = {legacy_guild_id(): self.scores}
+            self.dirty = True
+        self.answered = {
+            (gid, uid): set(s.get("answered", [])) for gid, users in self.scores.items() for uid, s in users.items()
+        }
+        self.question_list = load_questions()
+        for q in self.question_list:
+            q["id"] = str(q["id"])
+            self.question_index[int(q["id"])] = q
+            self.all_ids.add(int(q["id"]))
+            self.by_submitter.setdefault(q.get("submitter"), SortedList()).add(int(q["id"]))
+            if q.get("status", "active") != "removed":
+                self.active_ids.add(int(q["id"]))
+        self.next_qid = max(self.question_index, default=0) + 1
+        self.loaded = True
+
+    def get(self, guild_id, uid):
+        self.load()
+        return self.scores.get(str(guild_id), {}).get(str(uid), new_score())
+
+    def ensure(self, guild_id, uid):
+        self.load()
+        s = self.scores.setdefault(str(guild_id), {}).setdefault(str(uid), new_score())
+        s.setdefault("answered", [])
+        s.setdefault("last_contrib", None)
+        return s
+
+    def items(self, guild_id):
+        self.load()
+        return self.scores.get(str(guild_id), {}).items()
+
+    def changed(self, guild_id, uid, s):
+        self.dirty = True
+        if self.on_change:
+            self.on_change(str(guild_id), str(uid), s["insight_points"], s["contribution_points"])
+
+    def record_answer(self, guild_id, uid, qid):
+        guild_id, uid = str(guild_id), str(uid)
+        s = self.ensure(guild_id, uid)
+        seen = self.answered.setdefault((guild_id, uid), set())
+        if qid in seen:
+            return None
+        seen.add(qid)
+        s["insight_points"] += 1
+        s["answered"].append(qid)
+        self.changed(guild_id, uid, s)
+        return s["insight_points"], s["contribution_points"]
+
+    def claim_contribution(self, guild_id, uid, day):
+        s = self.ensure(guild_id, uid)
+        if s["last_contrib"] == day:
+            return False
+        s["contribution_points"] += 1
+        s["last_contrib"] = day
+        self.changed(guild_id, uid, s)
+        return True
+
+    def increment(self, guild_id, uid, insight=0, contribution=0):
+        s = self.ensure(guild_id, uid)
+        s["insight_points"] = max(0, s["insight_points"] + insight)
+        s["contribution_points"] = max(0, s["contribution_points"] + contribution)
+        self.changed(guild_id, uid, s)
+        return s["insight_points"], s["contribution_points"]
+
+    def add_points(self, guild_id, uid, field, amount):
+        insight, contribution = self.increment(guild_id, uid, *((amount, 0) if field == "insight_points" else (0, amount)))
+        return insight if field == "insight_points" else contribution
+
+    def apply_adjustments(self, guild_id, adjustments):
+        # One pass over the batch, then one write of the scores file
+        for uid, insight, contribution, mode in adjustments:
+            s = self.ensure(guild_id, uid)
+            if mode == "set":
+                s["insight_points"], s["contribution_points"] = max(0, insight), max(0, contribution)
+                self.changed(guild_id, uid, s)
+            else:
+                self.increment(guild_id, uid, insight, contribution)
+        self.flush()
+        return len(adjustments)
+
+    def questions(self):
+        self.load()
+        return [self.question_index[i] for i in self.active_ids]
+
+    def question_at(self, idx):
+        self.load()
+        return self.question_index[self.active_ids[idx]] if 0 <= idx < len(self.active_ids) else None
+
+    def question_count(self):
+        self.load()
+        return len(self.active_ids)
+
+    def get_question(self, qid):
+        self.load()
+        q = self.question_index.get(int(qid))
+        return q if q and q.get("status", "active") != "removed" else None
+
+    def next_question_after(self, qid):
+        self.load()
+        pos = self.active_ids.bisect_right(int(qid))
+        return self.question_index[self.active_ids[pos]] if pos < len(self.active_ids) else None
+
+    def filtered_ids(self, after, submitter, status):
+        if submitter is not None:
+            ids = self.by_submitter.get(submitter, ())
+        elif status == "active":
+            ids = self.active_ids
+        else:
+            ids = self.all_ids
+        for qid in ids.irange(minimum=after + 1) if ids else ():
+            if status == "all" or self.question_index[qid].get("status", "active") == status:
+                yield qid
+
+    def question_page(self, after, limit, submitter=None, status="active"):
+        # Keyset page: the first `limit` matching questions with an id above `after`
+        self.load()
+        return [
+            {**self.question_index[qid], "status": self.question_index[qid].get("status", "active")}
+            for qid in itertools.islice(self.filtered_ids(after, submitter, status), limit)
+        ]
+
+    def question_filter_count(self, submitter=None, status="active"):
+        self.load()
+        if submitter is None and status == "active":
+            return len(self.active_ids)
+        return sum(1 for _ in self.filtered_ids(0, submitter, status))
+
+    def add_question(self, text, submitter):
+        self.load()
+        nid = self.next_qid
+        self.next_qid += 1
+        q = {"id": str(nid), "question": text, "submitter": submitter}
+        self.question_list.append(q)
+        self.question_index[nid] = q
+        self.active_ids.add(nid)
+        self.all_ids.add(nid)
+        self.by_submitter.setdefault(submitter, SortedList()).add(nid)
+        self.question_version += 1
+        self.questions_dirty = True
+        return str(nid)
+
+    def remove_question(self, question_id):
+        try:
+            q = self.get_question(question_id)
+        except ValueError:
+            return False
+        if not q:
+            return False
+        q["status"] = "removed"
+        self.active_ids.discard(int(q["id"]))
+        self.question_version += 1
+        self.questions_dirty = True
+        return True
+
+    def flush(self):
+        if self.questions_dirty:
+            self.questions_dirty = False
+            try:
+                save_questions(self.question_list)
+            except Exception as e:
+                self.questions_dirty = True
+                print(f"❌ Failed to flush questions: {e}")
+        if not self.dirty:
+            return
+        self.dirty = False
+        try:
+            write_json_atomic(self.path, self.scores)
+        except Exception as e:
+            self.dirty = True
+            print(f"❌ Failed to flush scores: {e}")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS users (
+    guild_id TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    insight_points INTEGER NOT NULL DEFAULT 0,
+    contribution_points INTEGER NOT NULL DEFAULT 0,
+    last_contrib TEXT,
+    PRIMARY KEY (guild_id, uid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS answers (
+    guild_id TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    qid INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, uid, qid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    submitter TEXT,
+    status TEXT NOT NULL DEFAULT 'active'
+);
+CREATE INDEX IF NOT EXISTS idx_questions_submitter ON questions(submitter);
+"""
+
+class SqliteStore:
+    # Every change is a single-row statement committed on its own; in WAL mode with
+    # synchronous=NORMAL that is an append to the log, not a rewrite of the dataset.
+    def __init__(self, path):
+        self.path = path
+        self.db = None
+        self.question_version = 0
+        self.on_change = None
+
+    def changed(self, guild_id, uid, row):
+        if row and self.on_change:
+            self.on_change(guild_id, uid, row[0], row[1])
+
+    def load(self):
+        if self.db is not None:
+            return
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.unscope_legacy_tables()
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(questions)")}
+        if "status" not in columns:
+            self.db.execute("ALTER TABLE questions ADD COLUMN status TEXT NOT NULL DEFAULT 'active'")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_questions_status ON questions(status, id)")
+        self.migrate_json()
+        self.migrate_unscoped()
+
+    def unscope_legacy_tables(self):
+        # users/answers from before scores were kept per guild are set aside for migrate_unscoped
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(users)")}
+        if not columns or "guild_id" in columns:
+            return
+        self.db.execute("DROP INDEX IF EXISTS idx_users_insight")
+        self.db.execute("DROP INDEX IF EXISTS idx_users_contribution")
+        self.db.execute("ALTER TABLE users RENAME TO users_unscoped")
+        self.db.execute("ALTER TABLE answers RENAME TO answers_unscoped")
+        self.db.commit()
+
+    def migrate_unscoped(self):
+        if not self.db.execute("SELECT 1 FROM sqlite_master WHERE name = 'users_unscoped'").fetchone():
+            return
+        guild_id = legacy_guild_id()
+        with self.db:
+            count = self.db.execute(
+                "INSERT OR IGNORE INTO users (guild_id, uid, insight_points, contribution_points, last_contrib) "
+                "SELECT ?, uid, insight_points, contribution_points, last_contrib FROM users_unscoped", (guild_id,)
+            ).rowcount
+            self.db.execute("INSERT OR IGNORE INTO answers (guild_id, uid, qid) SELECT ?, uid, qid FROM answers_unscoped", (guild_id,))
+            self.db.execute("DROP TABLE users_unscoped")
+            self.db.execute("DROP TABLE answers_unscoped")
+        print(f"✅ Moved {count} users' scores to guild {guild_id}")
+
+    def migrate_json(self):
+        # One-shot import of questions.json / user_scores.json the first time the database is opened
+        if self.db.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+        scores = JsonStore(SCORES_FILE)
+        scores.load()
+        with self.db:
+            for q in load_questions():
+                self.db.execute(
+                    "INSERT OR IGNORE INTO questions (id, question, submitter, status) VALUES (?, ?, ?, ?)",
+                    (int(q["id"]), q["question"], q.get("submitter"), q.get("status", "active"))
+                )
+            for guild_id, users in scores.scores.items():
+                for uid, s in users.items():
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO users (guild_id, uid, insight_points, contribution_points, last_contrib) VALUES (?, ?, ?, ?, ?)",
+                        (guild_id, uid, s.get("insight_points", 0), s.get("contribution_points", 0), s.get("last_contrib"))
+                    )
+                    self.db.executemany(
+                        "INSERT OR IGNORE INTO answers (guild_id, uid, qid) VALUES (?, ?, ?)",
+                        [(guild_id, uid, qid) for qid in s.get("answered", [])]
+                    )
+            self.db.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (str(datetime.datetime.now()),))
+        print(f"✅ Migrated {sum(map(len, scores.scores.values()))} users from JSON into {self.path}")
+
+    def get(self, guild_id, uid):
+        self.load()
+        row = self.db.execute(
+            "SELECT insight_points, contribution_points, last_contrib FROM users WHERE guild_id = ? AND uid = ?", (str(guild_id), str(uid))
+        ).fetchone()
+        if not row:
+            return new_score()
+        return {"insight_points": row[0], "contribution_points": row[1], "last_contrib": row[2]}
+
+    def items(self, guild_id):
+        self.load()
+        for row in self.db.execute(
+            "SELECT uid, insight_points, contribution_points, last_contrib FROM users WHERE guild_id = ?", (str(guild_id),)
+        ):
+            yield row[0], {"insight_points": row[1], "contribution_points": row[2], "last_contrib": row[3]}
+
+    def record_answer(self, guild_id, uid, qid):
+        self.load()
+        guild_id, uid = str(guild_id), str(uid)
+        with self.db:
+            cur = self.db.execute("INSERT OR IGNORE INTO answers (guild_id, uid, qid) VALUES (?, ?, ?)", (guild_id, uid, qid))
+            if cur.rowcount == 0:
+                return None
+            row = self.db.execute(
+                "INSERT INTO users (guild_id, uid, insight_points) VALUES (?, ?, 1) "
+                "ON CONFLICT(guild_id, uid) DO UPDATE SET insight_points = insight_points + 1 "
+                "RETURNING insight_points, contribution_points",
+                (guild_id, uid)
+            ).fetchone()
+        self.changed(guild_id, uid, row)
+        return row[0], row[1]
+
+    def claim_contribution(self, guild_id, uid, day):
+        self.load()
+        guild_id, uid = str(guild_id), str(uid)
+        with self.db:
+            row = self.db.execute(
+                "INSERT INTO users (guild_id, uid, contribution_points, last_contrib) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT(guild_id, uid) DO UPDATE SET contribution_points = contribution_points + 1, last_contrib = excluded.last_contrib "
+                "WHERE last_contrib IS NOT excluded.last_contrib "
+                "RETURNING insight_points, contribution_points",
+                (guild_id, uid, day)
+            ).fetchone()
+        self.changed(guild_id, uid, row)
+        return row is not None
+
+    INCREMENT_SQL = (
+        "INSERT INTO users (guild_id, uid, insight_points, contribution_points) VALUES (?, ?, max(0, ?), max(0, ?)) "
+        "ON CONFLICT(guild_id, uid) DO UPDATE SET insight_points = max(0, insight_points + ?), "
+        "contribution_points = max(0, contribution_points + ?) "
+        "RETURNING insight_points, contribution_points"
+    )
+
+    def increment(self, guild_id, uid, insight=0, contribution=0):
+        self.load()
+        guild_id, uid = str(guild_id), str(uid)
+        with self.db:
+            row = self.db.execute(self.INCREMENT_SQL, (guild_id, uid, insight, contribution, insight, contribution)).fetchone()
+        self.changed(guild_id, uid, row)
+        return row[0], row[1]
+
+    def add_points(self, guild_id, uid, field, amount):
+        if field not in ("insight_points", "contribution_points"):
+            raise ValueError(f"Unknown score field: {field}")
+        insight, contribution = self.increment(guild_id, uid, *((amount, 0) if field == "insight_points" else (0, amount)))
+        return insight if field == "insight_points" else contribution
+
+    def apply_adjustments(self, guild_id, adjustments):
+        # All rows in one transaction: either the whole batch lands or none of it
+        self.load()
+        guild_id = str(guild_id)
+        rows = []
+        with self.db:
+            for uid, insight, contribution, mode in adjustments:
+                if mode == "set":
+                    sql = (
+                        "INSERT INTO users (guild_id, uid, insight_points, contribution_points) VALUES (?, ?, max(0, ?), max(0, ?)) "
+                        "ON CONFLICT(guild_id, uid) DO UPDATE SET insight_points = excluded.insight_points, "
+                        "contribution_points = excluded.contribution_points "
+                        "RETURNING insight_points, contribution_points"
+                    )
+                    args = (guild_id, uid, insight, contribution)
+                else:
+                    sql = self.INCREMENT_SQL
+                    args = (guild_id, uid, insight, contribution, insight, contribution)
+                rows.append((uid, self.db.execute(sql, args).fetchone()))
+        for uid, row in rows:
+            self.changed(guild_id, uid, row)
+        return len(rows)
+
+    @staticmethod
+    def question_row(row):
+        return {"id": str(row[0]), "question": row[1], "submitter": row[2]} if row else None
+
+    def questions(self):
+        self.load()
+        return [
+            self.question_row(row)
+            for row in self.db.execute("SELECT id, question, submitter FROM questions WHERE status != 'removed' ORDER BY id")
+        ]
+
+    def question_at(self, idx):
+        # Positional lookup walks the table; only used to place a guild's cursor the first time
+        self.load()
+        if idx < 0:
+            return None
+        return self.question_row(self.db.execute(
+            "SELECT id, question, submitter FROM questions WHERE status != 'removed' ORDER BY id LIMIT 1 OFFSET ?", (idx,)
+        ).fetchone())
+
+    def question_count(self):
+        self.load()
+        return self.db.execute("SELECT count(*) FROM questions WHERE status != 'removed'").fetchone()[0]
+
+    def get_question(self, qid):
+        self.load()
+        return self.question_row(self.db.execute(
+            "SELECT id, question, submitter FROM questions WHERE id = ? AND status != 'removed'", (int(qid),)
+        ).fetchone())
+
+    def next_question_after(self, qid):
+        self.load()
+        return self.question_row(self.db.execute(
+            "SELECT id, question, submitter FROM questions WHERE id > ? AND status != 'removed' ORDER BY id LIMIT 1", (int(qid),)
+        ).fetchone())
+
+    def question_page(self, after, limit, submitter=None, status="active"):
+        # Keyset page over the primary key; the status and submitter indexes cover the filters
+        self.load()
+        where, args = self.question_filter(submitter, status)
+        rows = self.db.execute(
+            f"SELECT id, question, submitter, status FROM questions WHERE id > ?{where} ORDER BY id LIMIT ?",
+            (after, *args, limit)
+        )
+        return [{**self.question_row(row), "status": row[3]} for row in rows]
+
+    def question_filter_count(self, submitter=None, status="active"):
+        self.load()
+        where, args = self.question_filter(submitter, status)
+        return self.db.execute(f"SELECT count(*) FROM questions WHERE 1{where}", args).fetchone()[0]
+
+    @staticmethod
+    def question_filter(submitter, status):
+        where, args = "", []
+        if status != "all":
+            where += " AND status = ?"
+            args.append(status)
+        if submitter is not None:
+            where += " AND submitter = ?"
+            args.append(submitter)
+        return where, args
+
+    def add_question(self, text, submitter):
+        self.load()
+        with self.db:
+            cur = self.db.execute("INSERT INTO questions (question, submitter) VALUES (?, ?)", (text, submitter))
+        self.question_version += 1
+        return str(cur.lastrowid)
+
+    def remove_question(self, question_id):
+        self.load()
+        try:
+            qid = int(question_id)
+        except ValueError:
+            return False
+        with self.db:
+            cur = self.db.execute("UPDATE questions SET status = 'removed' WHERE id = ? AND status != 'removed'", (qid,))
+        self.question_version += 1
+        return cur.rowcount > 0
+
+    def flush(self):
+        pass
+
+store = SqliteStore(DB_FILE) if STORAGE_BACKEND == 'sqlite' else JsonStore(SCORES_FILE)
+
+# ------- BATCH SCORE FILES -------
+# Batch adjustments come as CSV (header: uid,insight_points,contribution_points[,mode]) or
+# JSON (a list of objects with the same keys, or {uid: {...}}). mode is "add" (default,
+# values are deltas) or "set" (values replace the score, e.g. for a season reset). The whole
+# file is validated before anything is applied. Exports stream rows straight from the store.
+# Both act on one guild's scores.
+
+SCORE_COLUMNS = ("uid", "insight_points", "contribution_points", "last_contrib")
+
+def point_value(value):
+    # Blank is 0; bools and fractions are refused rather than truncated
+    if value is None or value == "":
+        return 0
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(value)
+    return int(value.strip() if isinstance(value, str) else value)
+
+def parse_adjustments(text, fmt):
+    if fmt == "json":
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = [{"uid": uid, **row} if isinstance(row, dict) else row for uid, row in data.items()]
+        if not isinstance(data, list):
+            raise ValueError("expected a list of rows or an object keyed by uid")
+        rows = data
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+
+    adjustments = []
+    for line, row in enumerate(rows, start=2 if fmt != "json" else 1):
+        if not isinstance(row, dict):
+            raise ValueError(f"row {line}: expected an object with uid, insight_points and contribution_points")
+        try:
+            uid = str(int(str(row["uid"]).strip().strip("<@!>")))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"row {line}: expected a numeric uid")
+        try:
+            insight = point_value(row.get("insight_points"))
+            contribution = point_value(row.get("contribution_points"))
+        except (TypeError, ValueError):
+            raise ValueError(f"row {line}: insight_points and contribution_points must be whole numbers")
+        mode = row.get("mode") or "add"
+        if not isinstance(mode, str) or mode.strip().lower() not in ("add", "set"):
+            raise ValueError(f"row {line}: mode must be 'add' or 'set', not '{mode}'")
+        mode = mode.strip().lower()
+        adjustments.append((uid, insight, contribution, mode))
+    return adjustments
+
+def export_scores(out, fmt, guild_id):
+    if fmt == "json":
+        out.write("{")
+        for n, (uid, s) in enumerate(store.items(guild_id)):
+            out.write(("," if n else "") + f"\n  {json.dumps(uid)}: ")
+            out.write(json.dumps({col: s.get(col) for col in SCORE_COLUMNS[1:]}))
+        out.write("\n}\n")
+        return
+    writer = csv.writer(out)
+    writer.writerow(SCORE_COLUMNS)
+    for uid, s in store.items(guild_id):
+        writer.writerow((uid, s["insight_points"], s["contribution_points"], s.get("last_contrib") or ""))
+
+def file_format(name):
+    return "json" if name.lower().endswith(".json") else "csv"
+
+def export_scores_file(path, guild_id):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        export_scores(f, file_format(path), guild_id)
+
+# ------- LEADERBOARD INDEX -------
+# One SortedList per category keyed by (-points, uid), kept in step with the store through
+# store.on_change, so a page is an O(page) slice and a user's position is an O(log n) lookup.
+# Each guild has its own index in `leaderboards`, built the first time that guild asks for it.
+
+LEADERBOARD_CATEGORIES = ("All", "Insight", "Contributor")
+
+class LeaderboardIndex:
+    def __init__(self):
+        self.points = {}  # uid -> (insight_points, contribution_points)
+        self.lists = {cat: SortedList() for cat in LEADERBOARD_CATEGORIES}
+        self.built = False
+        self.built_at = 0
+
+    @staticmethod
+    def values(ins, con):
+        return {"All": ins + con, "Insight": ins, "Contributor": con}
+
+    def build(self, rows):
+        # rows: (uid, score) pairs from store.items(guild_id), read off the event loop by the caller
+        if self.built:
+            return
+        for uid, s in rows:
+            # A uid already present came in through update() after the rows were read, so it's newer
+            if str(uid) not in self.points:
+                self.update(uid, s.get("insight_points", 0), s.get("contribution_points", 0))
+        self.built = True
+        self.built_at = tm.monotonic()
+
+    def reset(self):
+        # Forget everything; the next ensure_leaderboard() rebuilds from the store
+        self.points = {}
+        self.lists = {cat: SortedList() for cat in LEADERBOARD_CATEGORIES}
+        self.built = False
+
+    def update(self, uid, ins, con):
+        uid = str(uid)
+        old = self.points.get(uid)
+        if old == (ins, con):
+            return
+        if old:
+            for cat, pts in self.values(*old).items():
+                if pts > 0:
+                    self.lists[cat].remove((-pts, uid))
+        self.points[uid] = (ins, con)
+        for cat, pts in self.values(ins, con).items():
+            if pts > 0:
+                self.lists[cat].add((-pts, uid))
+
+    def count(self, cat):
+        return len(self.lists[cat])
+
+    def page(self, cat, page, per=10):
+        # -> list of (position, uid, insight_points, contribution_points)
+        start = page * per
+        return [
+            (pos, uid, *self.points[uid])
+            for pos, (_, uid) in enumerate(self.lists[cat].islice(start, start + per), start + 1)
+        ]
+
+    def position(self, cat, uid):
+        uid = str(uid)
+        ins, con = self.points.get(uid, (0, 0))
+        pts = self.values(ins, con)[cat]
+        if pts <= 0:
+            return None
+        return self.lists[cat].index((-pts, uid)) + 1
+
+leaderboards = {}  # str guild_id -> LeaderboardIndex
+
+def guild_leaderboard(guild_id):
+    return leaderboards.setdefault(str(guild_id), LeaderboardIndex())
+
+# ------- QUESTION QUEUE -------
+# Each guild has a cursor (the last question ID it posted), a list of pinned IDs to post next
+# and a {date: ID} schedule. The daily pick checks the schedule, then the pins, then the
+# first active question after the cursor, so removing or adding questions never shifts
+# what a guild posts. State is small (per guild) and lives in QUEUE_FILE.
+
+QUEUE_FILE = 'question_queue.json'
+
+class QuestionQueue:
+    def __init__(self, path):
+        self.path = path
+        self.state = None  # str(guild_id) -> {"cursor": id, "pinned": [ids], "scheduled": {day: id}}
+
+    def load(self):
+        if self.state is not None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except:
+            self.state = {}
+
+    def save(self):
+        write_json_atomic(self.path, self.state)
+
+    def guild(self, guild_id):
+        self.load()
+        return self.state.setdefault(str(guild_id), {"cursor": None, "pinned": [], "scheduled": {}})
+
+    def legacy_cursor(self, day_index):
+        # Guilds without a cursor continue from where the old START_DATE day-index scheme was
+        if day_index <= 0:
+            return 0
+        prev = store.question_at(min(day_index, store.question_count()) - 1)
+        return int(prev["id"]) if prev else 0
+
+    def pick(self, guild_id, day, day_index):
+        g = self.guild(guild_id)
+        q = None
+        qid = g["scheduled"].pop(day, None)
+        if qid is not None:
+            q = store.get_question(qid)
+        while q is None and g["pinned"]:
+            q = store.get_question(g["pinned"].pop(0))
+        if q is None:
+            if g["cursor"] is None:
+                g["cursor"] = self.legacy_cursor(day_index)
+            q = store.next_question_after(g["cursor"])
+            if q:
+                g["cursor"] = int(q["id"])
+        self.save()
+        return q
+
+    def peek(self, guild_id, day=None, day_index=0):
+        # What pick would post on `day`, leaving the cursor, pins and schedule as they are
+        g = self.guild(guild_id)
+        qid = g["scheduled"].get(day)
+        q = store.get_question(qid) if qid is not None else None
+        for qid in g["pinned"]:
+            if q:
+                break
+            q = store.get_question(qid)
+        if q is None:
+            cursor = g["cursor"] if g["cursor"] is not None else self.legacy_cursor(day_index)
+            q = store.next_question_after(cursor)
+        return q
+
+    def pin(self, guild_id, qid):
+        if not store.get_question(qid):
+            return False
+        self.guild(guild_id)["pinned"].insert(0, int(qid))
+        self.save()
+        return True
+
+    def schedule(self, guild_id, day, qid):
+        if not store.get_question(qid):
+            return False
+        self.guild(guild_id)["scheduled"][day] = int(qid)
+        self.save()
+        return True
+
+    def skip(self, guild_id):
+        g = self.guild(guild_id)
+        if g["pinned"]:
+            skipped = store.get_question(g["pinned"].pop(0))
+        else:
+            skipped = store.next_question_after(g["cursor"] or 0)
+            if skipped:
+                g["cursor"] = int(skipped["id"])
+        self.save()
+        return skipped
+
+question_queue = QuestionQueue(QUEUE_FILE)
+
+# ------- PER-USER LOCKS -------
+# Store calls are atomic on their own. When a handler strings several together for one user
+# (check then add, record then read back), it holds user_locks(uid) so another handler for the
+# same user can't slip in between. Other users never wait on it, and idle locks are dropped.
+
+class KeyedLock:
+    def __init__(self):
+        self.locks = {}  # key -> [asyncio.Lock, holders + waiters]
+
+    @contextlib.asynccontextmanager
+    async def __call__(self, key):
+        entry = self.locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self.locks[key]
+
+user_locks = KeyedLock()
+
+# ------- DUPLICATE INDEX -------
+# Submissions are checked against the bank in two steps: an exact lookup on a hash of the
+# normalized text, then MinHash/LSH over character 4-gram shingles for rewordings. Each
+# question keeps a DUP_HASHES-value signature (a compact array) built with one-permutation
+# hashing: every shingle is hashed once and lands in one of DUP_HASHES bins, each bin keeps
+# its minimum, and empty bins borrow from the next filled one. Signatures are bucketed by
+# DUP_BANDS bands, so a check hashes one text and only compares signatures that share a band.
+# The index is built from the store on first use and updated on every submit and removal.
+# Like the store it is only touched from the I/O thread.
+
+DUP_HASHES = 32
+DUP_BIN_BITS = 5  # 2 ** DUP_BIN_BITS == DUP_HASHES
+DUP_BANDS = 8  # 8 bands of 4 rows: pairs above ~0.6 similarity almost always share a band
+DUP_THRESHOLD = float(os.getenv('DUP_THRESHOLD', 0.6))
+DUP_SHINGLE = 4
+MASK64 = (1 << 64) - 1
+GOLDEN64 = 0x9E3779B97F4A7C15
+
+def normalize_question(text):
+    return " ".join(re.sub(r"[^\w\s]", " ", text.casefold()).split())
+
+class DuplicateIndex:
+    def __init__(self):
+        self.rows = DUP_HASHES // DUP_BANDS
+        self.exact = {}  # normalized-text digest -> set of ids
+        self.signatures = {}  # id -> (digest, array of DUP_HASHES values)
+        self.buckets = {}  # (band, band values) -> set of ids
+        self.built = False
+        self.last_id = 0
+        self.shared = False  # HTTP workers: other processes add and remove questions too
+
+    def signature(self, norm):
+        shingles = {norm[i:i + DUP_SHINGLE] for i in range(max(1, len(norm) - DUP_SHINGLE + 1))}
+        bins = [None] * DUP_HASHES
+        for s in shingles:
+            # Fibonacci hashing spreads crc32 over 64 bits: the top bits pick the bin, the next 32 are the value
+            h = (zlib.crc32(s.encode()) * GOLDEN64) & MASK64
+            b = h >> (64 - DUP_BIN_BITS)
+            v = (h >> (32 - DUP_BIN_BITS)) & 0xFFFFFFFF
+            if bins[b] is None or v < bins[b]:
+                bins[b] = v
+        sig = array('Q', [0] * DUP_HASHES)
+        for i in range(DUP_HASHES):
+            # Empty bins take the next filled bin's value, tagged with the distance so they only match each other
+            for step in range(DUP_HASHES):
+                v = bins[(i + step) % DUP_HASHES]
+                if v is not None:
+                    sig[i] = v | (step << 32)
+                    break
+        return sig
+
+    def bands(self, sig):
+        return [(band, tuple(sig[band * self.rows:(band + 1) * self.rows])) for band in range(DUP_BANDS)]
+
+    def build(self):
+        if self.built:
+            return
+        for q in store.questions():
+            self.insert(int(q["id"]), q["question"])
+        self.built = True
+
+    def insert(self, qid, text):
+        norm = normalize_question(text)
+        digest = hashlib.blake2b(norm.encode(), digest_size=8).digest()
+        sig = self.signature(norm)
+        self.exact.setdefault(digest, set()).add(qid)
+        self.signatures[qid] = (digest, sig)
+        self.last_id = max(self.last_id, qid)
+        for key in self.bands(sig):
+            self.buckets.setdefault(key, set()).add(qid)
+
+    def add(self, qid, text):
+        if self.built:
+            self.insert(int(qid), text)
+
+    def remove(self, qid):
+        entry = self.signatures.pop(int(qid), None)
+        if not entry:
+            return
+        digest, sig = entry
+        self.exact[digest].discard(int(qid))
+        for key in self.bands(sig):
+            self.buckets[key].discard(int(qid))
+
+    def catch_up(self):
+        # Index what other processes added since the last look
+        while True:
+            page = store.question_page(self.last_id, 500)
+            for q in page:
+                self.insert(int(q["id"]), q["question"])
+            if len(page) < 500:
+                return
 
-def load_scores():
+    def live(self, ids):
+        # -> the ids still in the bank, dropping any another process removed
+        alive = []
+        for qid in ids:
+            if store.get_question(qid):
+                alive.append(qid)
+            else:
+                self.remove(qid)
+        return alive
+
+    def check(self, text):
+        # -> (ids with the same normalized text, [(id, estimated similarity)] best first)
+        self.build()
+        if self.shared:
+            self.catch_up()
+        norm = normalize_question(text)
+        digest = hashlib.blake2b(norm.encode(), digest_size=8).digest()
+        exact = sorted(self.exact.get(digest, ()))
+        sig = self.signature(norm)
+        candidates = set()
+        for key in self.bands(sig):
+            candidates |= self.buckets.get(key, set())
+        near = []
+        for qid in candidates.difference(exact):
+            similarity = sum(map(operator.eq, sig, self.signatures[qid][1])) / DUP_HASHES
+            if similarity >= DUP_THRESHOLD:
+                near.append((qid, similarity))
+        near.sort(key=lambda item: -item[1])
+        if self.shared:
+            exact = self.live(exact)
+            alive = set(self.live([qid for qid, _ in near]))
+            near = [item for item in near if item[0] in alive]
+        return exact, near[:3]
+
+duplicate_index = DuplicateIndex()
+
+# ------- NON-BLOCKING I/O -------
+# Every storage call goes through run_io, which hands it to a single worker thread. The one
+# thread doubles as a serialized write queue, so the event loop never waits on disk.
+
+LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', 0.5))
+LOOP_LAG_WARN = float(os.getenv('LOOP_LAG_WARN', 0.25))
+
+io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-io")
+bot_loop = None
+metrics_runner = None
+loop_lag = {"last": 0.0, "max": 0.0}
+
+async def run_io(fn, *args):
+    # Timed from submission, so the histogram includes time spent queued behind other writes
+    start = tm.perf_counter()
     try:
-        with open(SCORES_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return await asyncio.get_running_loop().run_in_executor(io_executor, fn, *args)
+    finally:
+        metrics.observe("qotd_storage_seconds", fn.__name__, tm.perf_counter() - start)
+
+def read_guild_scores(guild_id):
+    return list(store.items(guild_id))
+
+async def ensure_leaderboard(guild_id):
+    # Each index is built on first use rather than at startup; on_score_change keeps it current after that
+    board = guild_leaderboard(guild_id)
+    if not board.built:
+        board.build(await run_io(read_guild_scores, guild_id))
+    return board
+
+def update_leaderboard(guild_id, uid, ins, con):
+    guild_leaderboard(guild_id).update(uid, ins, con)
+
+def on_score_change(guild_id, uid, ins, con):
+    # Store writes run on the I/O thread; apply the index update back on the event loop
+    if bot_loop is None:
+        update_leaderboard(guild_id, uid, ins, con)
+    else:
+        bot_loop.call_soon_threadsafe(update_leaderboard, guild_id, uid, ins, con)
+
+store.on_change = on_score_change
+
+# ------- SEND QUEUE -------
+# Channel messages go through send_queue instead of channel.send. Each channel has one worker
+# draining a priority heap, so the question post and voting messages go out ahead of
+# announcements and chatter queued before them. Runs of plain low-priority lines are merged
+# into one message. Each worker paces itself to Discord's per-channel message bucket
+# (SEND_BURST messages per SEND_WINDOW seconds); discord.py keeps the actual rate-limit
+# headers to itself and still waits out any 429 on top of that.
+
+PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW = 0, 1, 2
+LANE_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+SEND_BURST = int(os.getenv('SEND_BURST', 5))
+SEND_WINDOW = float(os.getenv('SEND_WINDOW', 5))
+
+class SendQueue:
+    def __init__(self):
+        self.lanes = {}  # channel id -> heap of (priority, seq, enqueued, channel, content, kwargs, future)
+        self.workers = {}  # channel id -> task draining that channel
+        self.sent = {}  # channel id -> deque of recent send times
+        self.seq = itertools.count()
+        self.depth = 0
+
+    def send(self, channel, content=None, priority=PRIORITY_NORMAL, **kwargs):
+        # -> future resolving to the sent discord.Message
+        future = asyncio.get_running_loop().create_future()
+        heap = self.lanes.setdefault(channel.id, [])
+        heapq.heappush(heap, (priority, next(self.seq), tm.perf_counter(), channel, content, kwargs, future))
+        self.depth += 1
+        metrics.set("qotd_send_queue_depth", self.depth)
+        worker = self.workers.get(channel.id)
+        if worker is None or worker.done():
+            self.workers[channel.id] = asyncio.create_task(self.drain(channel.id))
+        return future
+
+    def post(self, channel, content=None, priority=PRIORITY_NORMAL, **kwargs):
+        # Fire-and-forget variant of send: failures are logged instead of raised
+        self.send(channel, content, priority, **kwargs).add_done_callback(self.report)
+
+    def report(self, future):
+        if future.exception():
+            print(f"⚠️ Queued send failed: {future.exception()}")
+
+    def take(self, heap):
+        # Pop the next job, merging a run of plain low-priority lines into one message
+        priority, _, enqueued, channel, content, kwargs, future = heapq.heappop(heap)
+        jobs = [(priority, enqueued, future)]
+        if priority == PRIORITY_LOW and not kwargs and content:
+            while heap and heap[0][0] == PRIORITY_LOW and not heap[0][5] and heap[0][4]:
+                if len(content) + len(heap[0][4]) + 1 > MESSAGE_LIMIT:
+                    break
+                _, _, enqueued, _, more, _, future = heapq.heappop(heap)
+                content = f"{content}\n{more}"
+                jobs.append((priority, enqueued, future))
+            if len(jobs) > 1:
+                metrics.inc("qotd_send_coalesced_total", None, len(jobs) - 1)
+        return channel, content, kwargs, jobs
+
+    async def pace(self, channel_id):
+        sent = self.sent.setdefault(channel_id, deque(maxlen=SEND_BURST))
+        if len(sent) == SEND_BURST:
+            wait = sent[0] + SEND_WINDOW - tm.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        sent.append(tm.monotonic())
+
+    async def drain(self, channel_id):
+        heap = self.lanes[channel_id]
+        while heap:
+            await self.pace(channel_id)
+            channel, content, kwargs, jobs = self.take(heap)
+            self.depth -= len(jobs)
+            metrics.set("qotd_send_queue_depth", self.depth)
+            now = tm.perf_counter()
+            for priority, enqueued, _ in jobs:
+                metrics.observe("qotd_send_wait_seconds", LANE_NAMES[priority], now - enqueued)
+            try:
+                message = await channel.send(content, **kwargs)
+            except Exception as e:
+                for _, _, future in jobs:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for _, _, future in jobs:
+                if not future.done():
+                    future.set_result(message)
+
+send_queue = SendQueue()
+
+# ------- MEMBER CACHE -------
+# Display names are learned from interaction payloads and messages (both carry the member's
+# current nick), so the bot runs without the members intent and never chunks member lists.
+# Entries are keyed by (guild_id, user_id) because nicks are per guild, expire after
+# MEMBER_CACHE_TTL so renames are picked up on the member's next interaction, and the
+# least recently used entry is dropped once MEMBER_CACHE_SIZE is reached. DM channels are
+# opened once per user and kept in the same way.
+
+MEMBER_CACHE_SIZE = int(os.getenv('MEMBER_CACHE_SIZE', 5000))
+MEMBER_CACHE_TTL = int(os.getenv('MEMBER_CACHE_TTL', 6 * 3600))
+
+class MemberCache:
+    def __init__(self, size=MEMBER_CACHE_SIZE, ttl=MEMBER_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.names = OrderedDict()  # (guild_id, user_id) -> (display_name, expires)
+        self.dms = OrderedDict()  # user_id -> (DMChannel, expires)
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, entries, key, value):
+        entries[key] = (value, tm.monotonic() + self.ttl)
+        entries.move_to_end(key)
+        if len(entries) > self.size:
+            entries.popitem(last=False)
+
+    def get(self, entries, key):
+        entry = entries.get(key)
+        if entry is None or entry[1] < tm.monotonic():
+            entries.pop(key, None)
+            self.misses += 1
+            return None
+        entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def remember(self, guild_id, user):
+        if user is None or user.bot:
+            return
+        self.put(self.names, (guild_id, user.id), user.display_name)
+
+    def display_name(self, guild_id, uid, fallback=None):
+        return self.get(self.names, (guild_id, int(uid))) or fallback or f"User {uid}"
+
+    async def dm_channel(self, uid):
+        channel = self.get(self.dms, uid)
+        if channel is None:
+            # One REST call per user per TTL instead of a fetch_user on every notification
+            channel = await client.create_dm(discord.Object(id=uid))
+            self.put(self.dms, uid, channel)
+        return channel
+
+member_cache = MemberCache()
+
+# ------- ADMIN DIGEST -------
+# Admin notices (anonymous answers, forwarded DMs, new submissions) are buffered per
+# destination and sent as one digest, chunked to Discord's message limit, every
+# DIGEST_INTERVAL seconds or as soon as DIGEST_MAX_NOTICES pile up for one destination.
+# Every notice is appended to ADMIN_DIGEST_FILE before it is acknowledged, and the file is
+# only rewritten once a digest went out, so pending notices survive a restart.
+# Destinations are "channel:<id>" or "dm:<user id>".
+
+ADMIN_DIGEST_FILE = 'admin_digest.jsonl'
+DIGEST_INTERVAL = int(os.getenv('DIGEST_INTERVAL', 120))
+DIGEST_MAX_NOTICES = int(os.getenv('DIGEST_MAX_NOTICES', 25))
+MESSAGE_LIMIT = 2000
+
+class AdminDigest:
+    def __init__(self, path):
+        self.path = path
+        self.pending = {}  # destination -> [notice text]
+        self.loaded = False
+        self.lock = asyncio.Lock()
+        self.flushes = set()  # early flushes still running; asyncio itself only keeps weak references
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        notice = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn final line from a crash mid-append
+                    self.pending.setdefault(notice["to"], []).append(notice["text"])
+        except FileNotFoundError:
+            pass
+
+    def append(self, to, text):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"to": to, "text": text}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def rewrite(self, notices):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for to, text in notices:
+                f.write(json.dumps({"to": to, "text": text}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    async def notify(self, to, text):
+        # Buffer first, then persist: a rewrite queued after this append always includes it
+        notices = self.pending.setdefault(to, [])
+        notices.append(text[:MESSAGE_LIMIT - 100])
+        await run_io(self.append, to, notices[-1])
+        if len(notices) >= DIGEST_MAX_NOTICES:
+            task = asyncio.create_task(self.flush(to))
+            self.flushes.add(task)
+            task.add_done_callback(self.flushed)
+
+    def flushed(self, task):
+        self.flushes.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"⚠️ Admin digest flush failed: {task.exception()}")
+
+    def chunks(self, notices):
+        # -> list of (message text, number of notices it carries)
+        out = []
+        lines, size = [], 0
+        for text in notices:
+            if lines and size + len(text) + 1 > MESSAGE_LIMIT - 100:
+                out.append(lines)
+                lines, size = [], 0
+            lines.append(text)
+            size += len(text) + 1
+        if lines:
+            out.append(lines)
+        return [
+            (f"📬 **Admin digest** ({len(part)} notice{'s' if len(part) != 1 else ''})\n" + "\n".join(part), len(part))
+            for part in out
+        ]
+
+    async def destination(self, to):
+        kind, _, target = to.partition(":")
+        if kind == "dm":
+            return await member_cache.dm_channel(int(target))
+        return client.get_channel(int(target))
+
+    async def flush(self, to=None):
+        async with self.lock:
+            changed = False
+            for dest in [to] if to else list(self.pending):
+                notices = self.pending.get(dest)
+                if not notices:
+                    continue
+                sent = 0
+                try:
+                    channel = await self.destination(dest)
+                    if channel is None:
+                        print(f"⚠️ Admin digest destination {dest} not found; keeping {len(notices)} notices")
+                        continue
+                    for content, count in self.chunks(list(notices)):
+                        await send_queue.send(channel, content)
+                        sent += count
+                except discord.HTTPException as e:
+                    print(f"⚠️ Could not send admin digest to {dest}: {e}")
+                if sent:
+                    # Anything added while we were sending stays queued behind the sent ones
+                    del notices[:sent]
+                    if not notices:
+                        del self.pending[dest]
+                    changed = True
+            if changed:
+                remaining = [(dest, text) for dest, notices in self.pending.items() for text in notices]
+                await run_io(self.rewrite, remaining)
+
+admin_digest = AdminDigest(ADMIN_DIGEST_FILE)
+
+# ------- NOTICE RELAY -------
+# HTTP workers can't reach the admin digest, which lives in the gateway process, so they append
+# their notices to a per-day file under NOTICE_DIR instead. The gateway forwards new lines to
+# the digest on every journal follow and records how far it got in NOTICE_STATE_FILE, so notices
+# written while it was down go out after a restart. A crash between the two can send a notice
+# twice but never loses one. Files are deleted once read and NOTICE_KEEP_DAYS old.
+
+NOTICE_DIR = 'notices'
+NOTICE_STATE_FILE = os.path.join(NOTICE_DIR, 'forwarded.json')
+NOTICE_KEEP_DAYS = 2
+
+def append_line(path, event):
+    # One write() on an O_APPEND descriptor, so lines from several processes never interleave
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, (json.dumps(event) + "\n").encode())
+    finally:
+        os.close(fd)
+
+def complete_lines(data):
+    # -> (events, bytes consumed). A line without its newline is still being written (or torn
+    # by a crash); it is left for the next read
+    end = data.rfind(b"\n") + 1
+    events = []
+    for line in data[:end].splitlines():
+        try:
+            events.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return events, end
+
+class NoticeRelay:
+    def __init__(self, directory=NOTICE_DIR, state_file=NOTICE_STATE_FILE):
+        self.dir = directory
+        self.state_file = state_file
+        self.offsets = {}  # file name -> bytes already forwarded
+
+    def today(self):
+        return datetime.datetime.now(datetime.timezone.utc).date()
+
+    def append(self, to, text):
+        self.write({"to": to, "text": text})
+
+    def write(self, event):
+        os.makedirs(self.dir, exist_ok=True)
+        append_line(os.path.join(self.dir, f"{self.today()}.jsonl"), event)
+
+    def load(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.offsets = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.offsets = {}
+
+    def read(self):
+        # -> [(file name, offset after the complete lines, notices)]
+        try:
+            names = sorted(n for n in os.listdir(self.dir) if n.endswith(".jsonl"))
+        except FileNotFoundError:
+            return []
+        batches = []
+        for name in names:
+            offset = self.offsets.get(name, 0)
+            with open(os.path.join(self.dir, name), 'rb') as f:
+                f.seek(offset)
+                notices, consumed = complete_lines(f.read())
+            batches.append((name, offset + consumed, notices))
+        return batches
+
+    def expired(self, name):
+        # No worker writes to a file this old any more
+        return name < f"{self.today() - datetime.timedelta(days=NOTICE_KEEP_DAYS)}.jsonl"
+
+    def commit(self, batches):
+        for name, offset, _ in batches:
+            if self.expired(name):
+                os.remove(os.path.join(self.dir, name))
+                self.offsets.pop(name, None)
+            else:
+                self.offsets[name] = offset
+        write_json_atomic(self.state_file, self.offsets)
+
+    async def forward(self):
+        batches = await run_io(self.read)
+        if not any(notices or self.expired(name) for name, _, notices in batches):
+            return
+        for _, _, notices in batches:
+            for notice in notices:
+                await self.deliver(notice)
+        await run_io(self.commit, batches)
+
+    async def deliver(self, notice):
+        await admin_digest.notify(notice["to"], notice["text"])
+
+notice_relay = NoticeRelay()
+
+async def notify_admins(to, text):
+    if HTTP_WORKER:
+        await run_io(notice_relay.append, to, text)
+    else:
+        await admin_digest.notify(to, text)
+
+# ------- GUILDS -------
+# Each configured guild gets a GuildRound holding its own submission/voting state, journal and
+# purge log. Scheduled jobs fan out over all rounds through for_each_guild, GUILD_CONCURRENCY
+# guilds at a time; each guild posts to its own channel bucket and discord.py waits out any 429s.
+#
+# Today's round (question, answers, submission state, voting message, votes) is journaled as
+# append-only JSON lines and replayed on startup, so a restart mid-day keeps every answer and
+# vote. Once JOURNAL_COMPACT_EVERY lines pile up the file is rewritten as a snapshot.
+#
+# In HTTP mode the journal is also how processes talk: workers append answers and votes, and
+# every process follows the file with a JournalReader. Compaction is off then,
+# since a rewrite could drop a line another process is appending.
+
+GUILDS_FILE = 'guilds.json'
+JOURNAL_DIR = 'journals'
+PURGE_LOG_DIR = 'purge_logs'
+GUILD_CONCURRENCY = int(os.getenv('GUILD_CONCURRENCY', 16))
+JOURNAL_COMPACT_EVERY = int(os.getenv('JOURNAL_COMPACT_EVERY', 500))
+JOURNAL_FOLLOW_INTERVAL = float(os.getenv('JOURNAL_FOLLOW_INTERVAL', 2))
+
+class JournalReader:
+    # Follows a journal across processes: each read returns the complete lines appended since
+    # the last one, starting over when the file was replaced (a new round or a compaction)
+    def __init__(self, path):
+        self.path = path
+        self.inode = None
+        self.offset = 0
+
+    def read(self):
+        # -> (events, whether the file was replaced since the last read)
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return [], False
+        with f:
+            st = os.fstat(f.fileno())
+            restarted = st.st_ino != self.inode or st.st_size < self.offset
+            if restarted:
+                self.inode, self.offset = st.st_ino, 0
+            f.seek(self.offset)
+            events, consumed = complete_lines(f.read())
+        self.offset += consumed
+        return events, restarted
+
+    def skip(self):
+        # Continue from the current end, e.g. after this process rewrote the file itself
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        self.inode, self.offset = st.st_ino, st.st_size
+
+WORKER_EVENTS = ("answer", "vote")  # journal lines HTTP workers write
+
+class AnswerRecord:
+    # One per answer for the whole day: slots instead of a dict, and the name only as the
+    # fallback for when the member cache no longer knows the user
+    __slots__ = ("answer", "name", "anonymous")
+
+    def __init__(self, answer, name, anonymous):
+        self.answer = answer
+        self.name = name
+        self.anonymous = anonymous
+
+    def event(self):
+        # Anonymous answers carry no name anywhere they are written down
+        if self.anonymous:
+            return {"answer": self.answer, "anonymous": True}
+        return {"answer": self.answer, "name": self.name, "anonymous": False}
+
+class GuildRound:
+    def __init__(self, guild_id, channel_id, admin_channel_id=None, timezone=None):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.admin_channel_id = admin_channel_id or channel_id
+        self.timezone = timezone or DEFAULT_TIMEZONE
+        self.tz = ZoneInfo(self.timezone)
+        self.submission_open = True
+        self.voting_message = None
+        self.voting_view = None
+        self.answer_log = {}  # user id (int) -> AnswerRecord
+        self.day = None
+        self.qid = None
+        self.question_message_id = None
+        self.thread_id = None  # today's answer thread under the question post
+        self.digest_id = None
+        self.voting_message_id = None
+        self.answer_digest = None
+        self.journal_file = os.path.join(JOURNAL_DIR, f"{guild_id}.jsonl")
+        self.reader = JournalReader(self.journal_file)
+        self.purge_log = os.path.join(PURGE_LOG_DIR, f"{guild_id}.log")
+        self.journal_lines = 0
+        self.journal_compacted = 0  # lines the last snapshot left; compaction counts appends past it
+        self.restored = False
+
+    @property
+    def channel(self):
+        return client.get_channel(self.channel_id)
+
+    @property
+    def admin_channel(self):
+        return client.get_channel(self.admin_channel_id)
+
+    @property
+    def answer_channel(self):
+        # Answers go to today's thread; without one (no permission, or not cached) they stay in the channel
+        return (client.get_channel(self.thread_id) if self.thread_id else None) or self.channel
+
+    def config(self):
+        return {"channel_id": self.channel_id, "admin_channel_id": self.admin_channel_id, "timezone": self.timezone}
+
+    def today(self):
+        return scheduler.clock.now().astimezone(self.tz).date()
+
+    def journal_append(self, event):
+        append_line(self.journal_file, event)
+        self.journal_lines += 1
+
+    def journal_rewrite(self, events):
+        tmp = f"{self.journal_file}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal_file)
+        self.reader.skip()
+        self.journal_lines = self.journal_compacted = len(events)
+
+    def snapshot(self):
+        events = [{
+            "t": "question", "day": self.day, "qid": self.qid, "message_id": self.question_message_id,
+            "thread_id": self.thread_id, "digest_id": self.answer_digest.message.id if self.answer_digest else None,
+        }]
+        for uid, record in self.answer_log.items():
+            events.append({"t": "answer", "uid": str(uid), **record.event()})
+        if not self.submission_open:
+            events.append({"t": "close"})
+        if self.voting_message and self.voting_view:
+            events.append({"t": "voting", "message_id": self.voting_message.id, "answers": self.voting_view.entries()})
+            for voter, idx in self.voting_view.user_votes.items():
+                events.append({"t": "vote", "voter": str(voter), "idx": idx})
+        return events
+
+    async def journal(self, event):
+        await run_io(self.journal_append, event)
+        # Workers never hold the voting message or the digest, so a snapshot of theirs would drop the ballot
+        if INTERACTIONS_MODE == "gateway" and not HTTP_WORKER and self.journal_lines - self.journal_compacted >= JOURNAL_COMPACT_EVERY:
+            await run_io(self.journal_rewrite, self.snapshot())
+
+    def reset(self):
+        self.submission_open = True
+        self.voting_message = self.voting_view = None
+        self.answer_log = {}
+        self.day = self.qid = self.question_message_id = None
+        self.thread_id = self.digest_id = self.voting_message_id = None
+
+    def apply(self, e):
+        # One journal event; restore replays the whole file through here, followers just the new lines
+        t = e["t"]
+        if t == "question":
+            self.reset()
+            self.day, self.qid, self.question_message_id = e["day"], e["qid"], e["message_id"]
+            self.thread_id, self.digest_id = e.get("thread_id"), e.get("digest_id")
+        elif t == "answer":
+            self.answer_log[int(e["uid"])] = AnswerRecord(e["answer"], e.get("name"), e["anonymous"])
+        elif t == "close":
+            self.submission_open = False
+        elif t == "voting":
+            self.voting_view = VotingView(e["answers"], self)
+            self.voting_message_id = e["message_id"]
+        elif t == "vote" and self.voting_view:
+            if e["idx"] < len(self.voting_view.answers):
+                self.voting_view.cast(int(e["voter"]), e["idx"])
+        elif t == "end":
+            self.voting_view = None
+            self.voting_message_id = None
+
+    async def refresh(self):
+        # HTTP workers: catch up with the journal before handling one of this guild's interactions
+        events, restarted = await run_io(self.reader.read)
+        if restarted:
+            self.reset()
+        for e in events:
+            self.apply(e)
+
+    async def follow(self):
+        # HTTP mode, gateway side: apply what the workers appended and do the Discord part of it
+        # here, where the send queue, the digests and the voting message live
+        events, _ = await run_io(self.reader.read)
+        for e in events:
+            if e["t"] not in WORKER_EVENTS:
+                continue  # our own lines
+            self.apply(e)
+            if e["t"] == "answer":
+                if not e["anonymous"] and "scores" in e:
+                    self.post_answer(e["uid"], e["answer"], *e["scores"])
+                if self.answer_digest:
+                    self.answer_digest.schedule_render()
+            elif e["t"] == "vote" and self.voting_view:
+                self.voting_view.schedule_render()
+
+    def post_answer(self, uid, answer, insight, contribution):
+        # HTTP workers leave the echo to the gateway process, which sees the answer in the journal
+        if HTTP_WORKER:
+            return
+        msg = (
+            f"📝 <@{uid}>: {answer}\n"
+            f"⭐ {insight} | 💡 {contribution} | 🏆 {get_rank(insight + contribution)}"
+        )
+        # The echo joins the thread's low-priority lane and may share a message with other answers
+        send_queue.post(self.answer_channel, msg, priority=PRIORITY_LOW)
+
+    async def archive(self, tally):
+        # Idempotent: a day already in the guild's archive index is skipped
+        if not self.day or not self.answer_log:
+            return
+        q = await run_io(store.get_question, self.qid) if self.qid else None
+        await run_io(archive_round, self.guild_id, self.day, self.qid, q["question"] if q else None, self.answer_log, tally)
+
+    async def start(self, qid, message_id, thread_id=None, digest_message=None):
+        # Yesterday's round is archived here if voting never ran (e.g. only anonymous answers)
+        await self.archive({})
+        if self.answer_digest:
+            self.answer_digest.cancel_render()
+        self.reset()
+        self.day = str(self.today())
+        self.qid = qid
+        self.question_message_id = message_id
+        self.thread_id = thread_id
+        self.answer_digest = AnswerDigest(self, digest_message) if digest_message else None
+        await run_io(self.journal_rewrite, self.snapshot())
+
+    async def restore(self):
+        # Replay is a single pass over the journal; only today's round is restored
+        if self.restored:
+            return
+        self.restored = True
+
+        events, _ = await run_io(self.reader.read)
+        self.journal_lines = len(events)
+        if not events or events[0].get("day") != str(self.today()):
+            return
+        for e in events:
+            self.apply(e)
+
+        if self.question_message_id and self.submission_open:
+            client.add_view(QuestionView(self.qid), message_id=self.question_message_id)
+
+        if self.digest_id and self.channel:
+            self.answer_digest = AnswerDigest(self, self.channel.get_partial_message(self.digest_id))
+
+        view = self.voting_view
+        if view and self.channel:
+            client.add_view(view, message_id=self.voting_message_id)
+            self.voting_message = view.message = self.channel.get_partial_message(self.voting_message_id)
+        else:
+            self.voting_view = None
+
+        votes = len(view.user_votes) if view else 0
+        print(f"♻️ Restored round for guild {self.guild_id} ({self.day}): {len(self.answer_log)} answers, {votes} votes")
+
+guild_rounds = {}  # guild_id -> GuildRound
+
+def load_guild_config():
+    try:
+        with open(GUILDS_FILE, 'r', encoding='utf-8') as f:
+            config = json.load(f)
     except:
-        return {}
+        config = {}
+    if GUILD_ID and CHANNEL_ID and str(GUILD_ID) not in config:
+        config[str(GUILD_ID)] = {"channel_id": CHANNEL_ID, "admin_channel_id": ADMIN_CHANNEL_ID}
+    os.makedirs(JOURNAL_DIR, exist_ok=True)
+    os.makedirs(PURGE_LOG_DIR, exist_ok=True)
+    return config
+
+def save_guild_config():
+    write_json_atomic(GUILDS_FILE, {str(gid): gr.config() for gid, gr in guild_rounds.items()})
+
+def configure_guild(gid, cfg):
+    # New guilds get a round; known ones take the channels and time zone as configured now
+    gr = guild_rounds.get(int(gid))
+    if gr is None:
+        gr = guild_rounds[int(gid)] = GuildRound(int(gid), cfg["channel_id"], cfg.get("admin_channel_id"), cfg.get("timezone"))
+    else:
+        gr.channel_id = cfg["channel_id"]
+        gr.admin_channel_id = cfg.get("admin_channel_id") or cfg["channel_id"]
+        gr.timezone = cfg.get("timezone") or DEFAULT_TIMEZONE
+        gr.tz = ZoneInfo(gr.timezone)
+    return gr
+
+async def load_guilds():
+    if guild_rounds:
+        return
+    for gid, cfg in (await run_io(load_guild_config)).items():
+        configure_guild(gid, cfg)
+    await run_io(save_guild_config)
+
+def get_round(guild_id):
+    return guild_rounds.get(guild_id)
 
-def save_scores(scores):
-    with open(SCORES_FILE, 'w', encoding='utf-8') as f:
-        json.dump(scores, f, indent=2)
+async def for_each_guild(handler):
+    sem = asyncio.Semaphore(GUILD_CONCURRENCY)
+
+    async def run(gr):
+        async with sem:
+            try:
+                await handler(gr)
+            except Exception as e:
+                print(f"❌ {handler.__name__} failed for guild {gr.guild_id}: {e}")
+
+    await asyncio.gather(*(run(gr) for gr in list(guild_rounds.values())))
 
 def get_rank(total):
     if total <= 10:
@@ -126,12 +2028,13 @@ def get_rank(total):
 def is_admin(interaction: discord.Interaction) -> bool:
     return interaction.user.guild_permissions.administrator or interaction.user.guild_permissions.manage_messages
 
-async def post_question():
-    questions = load_questions()
-    idx = (datetime.date.today() - START_DATE).days
-    if idx < 0 or idx >= len(questions):
+async def post_question(gr, preview=False):
+    # preview (the admin test sequence) posts what today would get without using it up
+    today = gr.today()
+    choose = question_queue.peek if preview else question_queue.pick
+    q = await run_io(choose, gr.guild_id, str(today), (today - START_DATE).days)
+    if q is None:
         return
-    q = questions[idx]
     question = q["question"]
     submitter = q.get("submitter")
     submitter_text = (
@@ -139,19 +2042,23 @@ async def post_question():
         if submitter else "🤖 Question by the Bot"
     )
 
-    ch = client.get_channel(CHANNEL_ID)
-    await ch.send(f"{question}\n\n{submitter_text}", view=QuestionView(idx))
+    qid = int(q["id"])
+    msg = await send_queue.send(gr.channel, f"{question}\n\n{submitter_text}", priority=PRIORITY_HIGH, view=QuestionView(qid))
+    thread, digest = await open_answer_thread(gr, msg, str(today))
+    await gr.start(qid, msg.id, thread.id if thread else None, digest)
     
 class QuestionView(View):
     def __init__(self, qid):
         super().__init__(timeout=None)
         self.qid = qid
 
-    @discord.ui.button(label="Answer Freely ⭐ (+1 Insight Point)", style=discord.ButtonStyle.primary)
+    @discord.ui.button(label="Answer Freely ⭐ (+1 Insight Point)", style=discord.ButtonStyle.primary, custom_id="qotd:answer:free")
+    @instrumented("QuestionView.freely")
     async def freely(self, interaction, button):
         await interaction.response.send_modal(AnswerModal(self.qid, interaction.user))
 
-    @discord.ui.button(label="Answer Anonymously 🔒 (0 Insight Points)", style=discord.ButtonStyle.secondary)
+    @discord.ui.button(label="Answer Anonymously 🔒 (0 Insight Points)", style=discord.ButtonStyle.secondary, custom_id="qotd:answer:anon")
+    @instrumented("QuestionView.anon")
     async def anon(self, interaction, button):
         await interaction.response.send_modal(AnonModal(self.qid, interaction.user))
 
@@ -164,30 +2071,27 @@ class AnswerModal(Modal, title="Answer the Question"):
         self.qid = qid
         self.user = user
 
+    @instrumented("AnswerModal.on_submit")
     async def on_submit(self, inter):
-        if not submission_open:
+        gr = get_round(inter.guild_id)
+        if not gr or not gr.submission_open:
             await inter.response.send_message("❌ Submissions are closed for today.", ephemeral=True)
             return
 
-        scores = load_scores()
         uid = str(self.user.id)
-        scores.setdefault(uid, {"insight_points": 0, "contribution_points": 0, "answered": []})
-        if self.qid not in scores[uid]["answered"]:
-            scores[uid]["insight_points"] += 1
-            scores[uid]["answered"].append(self.qid)
-            save_scores(scores)
-        total = scores[uid]["insight_points"] + scores[uid]["contribution_points"]
-        msg = (
-            f"📝 <@{uid}>: {self.answer.value}\n"
-            f"⭐ {scores[uid]['insight_points']} | 💡 {scores[uid]['contribution_points']} | 🏆 {get_rank(total)}"
-        )
-        await inter.response.send_message(msg)
-
-        answer_log[str(self.user.id)] = {
-            "answer": self.answer.value,
-            "user": self.user,
-            "anonymous": False
-        }
+        async with user_locks(uid):
+            scores = await run_io(store.record_answer, gr.guild_id, uid, self.qid)
+            if scores is None:  # already answered this question; show the score as it stands
+                s = await run_io(store.get, gr.guild_id, uid)
+                scores = s["insight_points"], s["contribution_points"]
+        # Close the modal now; the echo is queued behind it
+        await inter.response.defer()
+        gr.post_answer(uid, self.answer.value, *scores)
+
+        record = gr.answer_log[self.user.id] = AnswerRecord(self.answer.value, self.user.display_name, False)
+        if gr.answer_digest:
+            gr.answer_digest.schedule_render()
+        await gr.journal({"t": "answer", "uid": uid, **record.event(), "scores": list(scores)})
 
 class AnonModal(Modal, title="Answer Anonymously"):
     answer = TextInput(label="Anonymous answer", style=discord.TextStyle.paragraph)
@@ -197,116 +2101,451 @@ class AnonModal(Modal, title="Answer Anonymously"):
         self.qid = qid
         self.user = user
 
+    @instrumented("AnonModal.on_submit")
     async def on_submit(self, inter):
-        if not submission_open:
+        gr = get_round(inter.guild_id)
+        if not gr or not gr.submission_open:
             await inter.response.send_message("❌ Submissions are closed for today.", ephemeral=True)
             return
 
-        admin_ch = client.get_channel(ADMIN_CHANNEL_ID)
-        await admin_ch.send(f"📩 Anonymous (QID {self.qid}): {self.answer.value}")
+        await notify_admins(f"channel:{gr.admin_channel_id}", f"📩 Anonymous (QID {self.qid}): {self.answer.value}")
         await inter.response.send_message("✅ Received anonymously.", ephemeral=True)
 
-        answer_log[str(self.user.id)] = {
-            "answer": self.answer.value,
-            "user": self.user,
-            "anonymous": True
-        }
+        record = gr.answer_log[self.user.id] = AnswerRecord(self.answer.value, self.user.display_name, True)
+        if gr.answer_digest:
+            gr.answer_digest.schedule_render()
+        await gr.journal({"t": "answer", "uid": str(self.user.id), **record.event()})
+
+# ------- ANSWER THREAD -------
+# Each question post gets a thread for the day's answers, so answer echoes land there (on the
+# thread's own rate-limit bucket) instead of in the channel. The channel only gets one pinned
+# digest message: answer count plus the latest few answers, edited at most once per
+# ANSWER_DIGEST_INTERVAL however fast answers come in. Next day's purge archives the thread
+# with one call; Discord auto-archives it after a day of silence if that call never happens.
+
+ANSWER_DIGEST_INTERVAL = float(os.getenv('ANSWER_DIGEST_INTERVAL', 5))
+ANSWER_DIGEST_RECENT = 5
+THREAD_ARCHIVE_MINUTES = 1440
+
+class AnswerDigest:
+    def __init__(self, round, message):
+        self.round = round
+        self.message = message
+        self.dirty = False
+        self.render_task = None
+
+    def render(self):
+        gr = self.round
+        public = [(uid, record) for uid, record in gr.answer_log.items() if not record.anonymous]
+        anonymous = len(gr.answer_log) - len(public)
+        lines = [f"**{len(gr.answer_log)}** answers so far ({anonymous} anonymous)."]
+        if gr.thread_id:
+            lines.append(f"Read them all in <#{gr.thread_id}>.")
+        for uid, record in public[-ANSWER_DIGEST_RECENT:]:
+            lines.append(f"**{member_cache.display_name(gr.guild_id, uid, record.name)}**: {preview(record.answer, 150)}")
+        title = "📝 Today's answers" if gr.submission_open else "🔒 Answers are closed"
+        return discord.Embed(title=title, description="\n\n".join(lines))
+
+    def schedule_render(self):
+        self.dirty = True
+        if self.render_task is None or self.render_task.done():
+            self.render_task = asyncio.create_task(self.render_loop())
+
+    async def render_loop(self):
+        while self.dirty:
+            await asyncio.sleep(ANSWER_DIGEST_INTERVAL)
+            self.dirty = False
+            try:
+                await self.message.edit(embed=self.render())
+            except discord.HTTPException as e:
+                print(f"⚠️ Could not update answer digest: {e}")
+
+    def cancel_render(self):
+        if self.render_task and not self.render_task.done():
+            self.render_task.cancel()
+        self.dirty = False
+
+async def open_answer_thread(gr, question_msg, day):
+    # -> (thread, digest message); (None, None) leaves answers echoing into the channel
+    try:
+        thread = await question_msg.create_thread(name=f"Answers {day}", auto_archive_duration=THREAD_ARCHIVE_MINUTES)
+    except discord.HTTPException as e:
+        print(f"⚠️ Could not open an answer thread in guild {gr.guild_id}: {e}")
+        return None, None
+    empty = discord.Embed(title="📝 Today's answers", description=f"No answers yet. They'll collect in {thread.mention}.")
+    try:
+        digest = await send_queue.send(gr.channel, priority=PRIORITY_HIGH, embed=empty)
+    except discord.HTTPException as e:
+        print(f"⚠️ Could not post the answer digest in guild {gr.guild_id}: {e}")
+        return thread, None
+    try:
+        await digest.pin()
+    except discord.HTTPException as e:
+        print(f"⚠️ Could not pin the answer digest in guild {gr.guild_id}: {e}")
+    return thread, digest
+
+async def archive_answer_thread(gr):
+    if not gr.thread_id:
+        return
+    thread = client.get_channel(gr.thread_id)
+    try:
+        thread = thread or await client.fetch_channel(gr.thread_id)
+        await thread.edit(archived=True, locked=True)
+    except discord.HTTPException as e:
+        print(f"⚠️ Could not archive answer thread {gr.thread_id}: {e}")
+
+# ------- STARTUP -------
+# on_ready fires again whenever the gateway session can't be resumed, so everything in
+# first_ready runs once. The question bank, scores and leaderboard index are loaded on first
+# use instead of up front. Slash commands are only synced when the hash of the command tree
+# differs from the one saved after the last successful sync, and loops are only started if
+# they aren't already running. Time from process start to ready and each reconnect are
+# printed and exported as metrics.
+
+COMMAND_HASH_FILE = 'command_tree.json'
+startup = {"started": tm.perf_counter(), "ready": False, "disconnected": None}
+
+def command_tree_hash():
+    payload = [cmd.to_dict(tree) for cmd in sorted(tree.get_commands(), key=lambda c: c.name)]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def load_command_hashes():
+    try:
+        with open(COMMAND_HASH_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+async def sync_commands():
+    digest = command_tree_hash()
+    hashes = await run_io(load_command_hashes)
+    app_id = str(client.application_id)
+    # Before commands went global they were synced to GUILD_ID alone; clear those copies once or
+    # every command shows up twice there
+    legacy = f"{app_id}:guild:{GUILD_ID}"
+    if GUILD_ID and not hashes.get(legacy):
+        guild = discord.Object(id=GUILD_ID)
+        tree.clear_commands(guild=guild)
+        await tree.sync(guild=guild)
+        hashes[legacy] = "cleared"
+        await run_io(write_json_atomic, COMMAND_HASH_FILE, hashes)
+        print(f"🧹 Removed the old guild-only slash commands from guild {GUILD_ID}")
+    if hashes.get(app_id) == digest:
+        print("✅ Slash commands unchanged since the last sync; skipping tree.sync()")
+        return
+    synced = await tree.sync()
+    hashes[app_id] = digest
+    await run_io(write_json_atomic, COMMAND_HASH_FILE, hashes)
+    print(f"✅ Synced {len(synced)} slash commands globally for {len(guild_rounds)} configured guilds")
+
+def start_loops():
+    loops = [flush_scores, flush_admin_digest, measure_loop_lag]
+    if INTERACTIONS_MODE == "http":
+        loops.append(follow_journals)
+    for loop in loops:
+        if not loop.is_running():
+            loop.start()
+
+def report_reconnect(how):
+    if startup["disconnected"] is None:
+        return
+    elapsed = tm.perf_counter() - startup["disconnected"]
+    startup["disconnected"] = None
+    metrics.observe("qotd_reconnect_seconds", None, elapsed)
+    print(f"🔌 Reconnected ({how}) after {elapsed:.2f}s")
+
+async def first_ready():
+    await load_guilds()
+    await run_io(admin_digest.load)
+    await run_io(notice_relay.load)
+    await run_io(command_relay.load)
+
+    async def restore(gr):
+        await gr.restore()
+    await for_each_guild(restore)
+
+    try:
+        await sync_commands()
+    except Exception as e:
+        print(f"❌ Failed to sync commands: {e}")
+
+    await scheduler.start()
+    global metrics_runner
+    if metrics_runner is None:
+        try:
+            metrics_runner = await serve_metrics()
+        except OSError as e:
+            print(f"❌ Could not start metrics endpoint: {e}")
+
 @client.event
 async def on_ready():
+    global bot_loop
+    bot_loop = asyncio.get_running_loop()
+    if startup["ready"]:
+        report_reconnect("new session")
+        start_loops()
+        return
+
     print(f"✅ Logged in as {client.user} ({client.user.id})")
-    
+    setup_start = tm.perf_counter()
+    await first_ready()
+    start_loops()
+    startup["ready"] = True
+    elapsed = tm.perf_counter() - startup["started"]
+    metrics.set("qotd_startup_seconds", elapsed)
+    print(f"🚀 Ready {elapsed:.2f}s after start ({tm.perf_counter() - setup_start:.2f}s of it in on_ready)")
+
+@client.event
+async def on_disconnect():
+    if startup["ready"] and startup["disconnected"] is None:
+        startup["disconnected"] = tm.perf_counter()
+
+@client.event
+async def on_resumed():
+    report_reconnect("resumed")
+
+@tasks.loop(seconds=SCORES_FLUSH_SECONDS)
+async def flush_scores():
+    await run_io(store.flush)
+
+@tasks.loop(seconds=DIGEST_INTERVAL)
+async def flush_admin_digest():
+    await admin_digest.flush()
+
+@tasks.loop(seconds=JOURNAL_FOLLOW_INTERVAL)
+async def follow_journals():
+    for gr in list(guild_rounds.values()):
+        try:
+            await gr.follow()
+        except Exception as e:
+            print(f"⚠️ Could not follow the journal for guild {gr.guild_id}: {e}")
     try:
-        synced = await tree.sync(guild=discord.Object(id=GUILD_ID))
-        print(f"✅ Synced {len(synced)} slash commands to guild {GUILD_ID}")
+        await notice_relay.forward()
     except Exception as e:
-        print(f"❌ Failed to sync commands: {e}")
+        print(f"⚠️ Could not forward the workers' admin notices: {e}")
+    try:
+        await command_relay.forward()
+    except Exception as e:
+        print(f"⚠️ Could not pick up the workers' relayed commands: {e}")
+
+@tasks.loop(seconds=0)
+async def measure_loop_lag():
+    # Sleep for a fixed interval and see how late we wake up: anything beyond the interval
+    # is time the loop spent blocked on something else
+    start = tm.perf_counter()
+    await asyncio.sleep(LOOP_LAG_INTERVAL)
+    lag = max(0.0, tm.perf_counter() - start - LOOP_LAG_INTERVAL)
+    loop_lag["last"] = lag
+    loop_lag["max"] = max(loop_lag["max"], lag)
+    metrics.observe("qotd_event_loop_lag_seconds", None, lag)
+    metrics.set("qotd_event_loop_lag_max_seconds", loop_lag["max"])
+    if lag > LOOP_LAG_WARN:
+        logging.warning(f"⚠️ Event loop lagged {lag * 1000:.0f} ms")
+
+# ------- ANSWER ARCHIVE -------
+# When a round ends its question, every answer and the vote results are written to
+# ARCHIVE_DIR/<guild>/<day>.jsonl.gz, one JSON record per line; anonymous answers are flagged and
+# carry neither uid nor name there, since /history shows that file. A one-line summary goes into
+# that guild's index.json, which says which days exist. Who answered on which day, and which of
+# the day's answers is theirs, is appended to users/<shard>.txt, the shard picked by user id, so
+# /myanswers reads one small shard and then only the segments it needs; nothing is kept in
+# memory, and nothing but the per-day index is rewritten as the archive grows.
+
+ARCHIVE_DIR = 'archive'
+HISTORY_DAYS = 10
+ARCHIVE_USER_SHARDS = 64
+
+def archive_index_path(guild_id):
+    return os.path.join(ARCHIVE_DIR, str(guild_id), "index.json")
+
+def archive_segment_path(guild_id, day):
+    return os.path.join(ARCHIVE_DIR, str(guild_id), f"{day}.jsonl.gz")
+
+def archive_user_shard_path(guild_id, uid):
+    return os.path.join(ARCHIVE_DIR, str(guild_id), "users", f"{int(uid) % ARCHIVE_USER_SHARDS}.txt")
+
+def load_archive_index(guild_id):
+    try:
+        with open(archive_index_path(guild_id), 'r', encoding='utf-8') as f:
+            return json.load(f)  # day -> {"qid", "question", "answers", "votes", "winners"}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def archive_round(guild_id, day, qid, question, answer_log, tally):
+    index = load_archive_index(guild_id)
+    if day in index:
+        return
+    os.makedirs(os.path.dirname(archive_index_path(guild_id)), exist_ok=True)
+    top = max(tally.values(), default=0)
+    winners = [uid for uid, count in tally.items() if count == top and top > 0]
+    with gzip.open(archive_segment_path(guild_id, day), 'wt', encoding='utf-8') as f:
+        f.write(json.dumps({"t": "question", "day": day, "qid": qid, "question": question}) + "\n")
+        for uid, record in answer_log.items():
+            # Anonymous answers go into the segment without their uid; only the user's shard links them
+            who = {} if record.anonymous else {"uid": str(uid)}
+            f.write(json.dumps({"t": "answer", **who, **record.event(), "votes": tally.get(str(uid), 0)}) + "\n")
+        f.write(json.dumps({"t": "result", "winners": winners, "votes": sum(tally.values())}) + "\n")
+    # "<day> <uid> <n>" lines, n being the answer's position in the segment; a crash before the
+    # index is written only repeats lines, which reads ignore
+    shards = {}
+    for n, uid in enumerate(answer_log):
+        shards.setdefault(archive_user_shard_path(guild_id, uid), []).append(f"{day} {uid} {n}\n")
+    os.makedirs(os.path.join(ARCHIVE_DIR, str(guild_id), "users"), exist_ok=True)
+    for path, lines in shards.items():
+        with open(path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+    # The segment and the user shards are complete before the index points at the day
+    index[day] = {
+        "qid": qid,
+        "question": question,
+        "answers": len(answer_log),
+        "votes": sum(tally.values()),
+        "winners": winners,
+    }
+    write_json_atomic(archive_index_path(guild_id), index)
+
+def read_archive_segment(guild_id, day):
+    try:
+        with gzip.open(archive_segment_path(guild_id, day), 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    except FileNotFoundError:
+        return []
+
+def archive_recent_days(guild_id, limit=HISTORY_DAYS):
+    # -> [(day, summary)] newest first
+    index = load_archive_index(guild_id)
+    return [(day, index[day]) for day in sorted(index, reverse=True)[:limit]]
+
+def archive_user_answers(guild_id, uid, limit=HISTORY_DAYS):
+    # -> [(day, question, answer record)] newest first, reading only the days the user answered on
+    days = {}  # day -> position of the user's answer in that day's segment
+    try:
+        with open(archive_user_shard_path(guild_id, uid), 'r', encoding='utf-8') as f:
+            for line in f:
+                day, who, n = line.split()
+                if who == uid:
+                    days[day] = int(n)
+    except FileNotFoundError:
+        return []
+    found = []
+    for day in sorted(days, reverse=True)[:limit]:
+        records = read_archive_segment(guild_id, day)
+        question = next((r["question"] for r in records if r["t"] == "question"), None)
+        answers = [r for r in records if r["t"] == "answer"]
+        if days[day] < len(answers):
+            found.append((day, question, answers[days[day]]))
+    return found
+
+# ------- CHANNEL PURGE -------
+# Every message seen in a guild's question channel is logged to its purge log, so the daily
+# purge deletes exactly those IDs in 100-message bulk batches. Answers live in the day's
+# thread, which is archived rather than emptied, so the log stays short. Only messages older than
+# Discord's 14-day bulk-delete cutoff are deleted one at a time, PURGE_CONCURRENCY at once.
+
+PURGE_CONCURRENCY = int(os.getenv('PURGE_CONCURRENCY', 4))
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14, minutes=-5)
+
+def append_purge_log(path, message_id):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f"{message_id}\n")
+
+def take_purge_log(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            ids = {int(line) for line in f if line.strip()}
+    except FileNotFoundError:
+        return None
+    os.remove(path)
+    return sorted(ids)
+
+async def purge_tracked(gr):
+    ch = gr.channel
+    await archive_answer_thread(gr)
+    ids = await run_io(take_purge_log, gr.purge_log)
+    if ids is None:
+        # Nothing tracked yet (first run after deploy): fall back to a one-off sweep
+        await ch.purge(limit=1000)
+        return
+
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    recent = [i for i in ids if discord.utils.snowflake_time(i) > cutoff]
+    old = [i for i in ids if discord.utils.snowflake_time(i) <= cutoff]
 
-    purge_channel_before_post.start()
-    notify_upcoming_question.start()
-    post_daily_message.start()
-    submission_warning.start() 
-    close_submissions.start()
-    start_voting.start()
-    end_voting.start()
-
-@tasks.loop(time=time(hour=11, minute=50))
-async def purge_channel_before_post():
-    ch = client.get_channel(CHANNEL_ID)
-    await ch.purge(limit=1000)
-
-@tasks.loop(time=time(hour=11, minute=55))
-async def notify_upcoming_question():
-    ch_id = int(os.getenv("DISCORD_CHANNEL_ID") or 0)
-    channel = client.get_channel(ch_id)
-    if channel:
-        await channel.send("⏳ The next question will be posted soon! Submit your own question by using the /submitquestion command and earn 💡 Contribution Points ")
-
-@tasks.loop(time=time(hour=12, minute=0))
-async def post_daily_message():
-    await post_question()
-
-@tasks.loop(time=time(hour=16, minute=50))
-async def submission_warning():
-    channel = client.get_channel(CHANNEL_ID)
-    await channel.send("⏳ Submissions will close in 10 minutes! Get your answers in quickly!.")
-
-@tasks.loop(time=time(hour=17, minute=0))
-async def close_submissions():
-    global submission_open
-    submission_open = False
-    channel = client.get_channel(CHANNEL_ID)
-    await channel.send("🔒 Submissions are now closed for today's question. Voting will begin in 5 minutes Thank you!")
-@tasks.loop(time=time(hour=17, minute=5))
-async def start_voting():
-    global voting_message, submission_open
-
-    if submission_open:
+    for start in range(0, len(recent), 100):
+        batch = [discord.Object(id=i) for i in recent[start:start + 100]]
+        try:
+            await ch.delete_messages(batch)
+        except discord.NotFound:
+            # Someone already removed part of the batch; retry the rest one by one
+            old.extend(o.id for o in batch)
+        except discord.HTTPException as e:
+            print(f"⚠️ Bulk delete failed: {e}")
+            old.extend(o.id for o in batch)
+
+    sem = asyncio.Semaphore(PURGE_CONCURRENCY)
+
+    async def delete_one(message_id):
+        async with sem:
+            try:
+                await ch.get_partial_message(message_id).delete()
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                print(f"⚠️ Could not delete message {message_id}: {e}")
+
+    await asyncio.gather(*(delete_one(i) for i in old))
+    print(f"🧹 Purged {len(recent)} messages in bulk and {len(old)} individually in guild {gr.guild_id}")
+
+async def notify_guild(gr):
+    await send_queue.send(gr.channel, "⏳ The next question will be posted soon! Submit your own question by using the /submitquestion command and earn 💡 Contribution Points ")
+
+async def warn_guild(gr):
+    await send_queue.send(gr.channel, "⏳ Submissions will close in 10 minutes! Get your answers in quickly!.")
+
+async def close_guild_submissions(gr):
+    gr.submission_open = False
+    await gr.journal({"t": "close"})
+    if gr.answer_digest:
+        gr.answer_digest.schedule_render()
+    await send_queue.send(gr.channel, "🔒 Submissions are now closed for today's question. Voting will begin in 5 minutes Thank you!")
+
+async def open_voting(gr):
+    if gr.submission_open:
         return  # Don’t start voting if submissions are still open
 
-    channel = client.get_channel(CHANNEL_ID)
-    guild = client.get_guild(GUILD_ID)
+    channel = gr.channel
 
-    # Prepare answers for voting: include display name with user ID and answer
-    answers = []
-    for uid, data in answer_log.items():
-        if not data["anonymous"]:
-            member = guild.get_member(int(uid))
-            display_name = member.display_name if member else f"User {uid}"
-            answers.append((uid, display_name, data["answer"]))
+    # Prepare answers for voting; names are looked up as the ballot renders
+    answers = [(uid, record.answer) for uid, record in gr.answer_log.items() if not record.anonymous]
 
     if not answers:
-        await channel.send("⚠️ No answers were submitted for voting today. Anonymous answers can't be voted on.")
+        await send_queue.send(channel, "⚠️ No answers were submitted for voting today. Anonymous answers can't be voted on.")
         return
 
-    view = VotingView(answers)
-    content_lines = ["Vote for the best answer!"]
-    for idx, (uid, display_name, ans) in enumerate(answers, start=1):
-        content_lines.append(f"**Answer #{idx} ({display_name}):** {ans}")
-
-    content = "\n".join(content_lines)
-    voting_message = await channel.send(content, view=view)
+    view = gr.voting_view = VotingView(answers, gr)
+    content = f"🗳️ Voting is open for {len(answers)} answers! Press **Open ballot** to read them all and vote."
+    gr.voting_message = view.message = await send_queue.send(channel, content, priority=PRIORITY_HIGH, embed=view.render(), view=view)
+    await gr.journal({"t": "voting", "message_id": gr.voting_message.id, "answers": view.entries()})
 
-@tasks.loop(time=time(hour=18, minute=10))
-async def end_voting():
-    global voting_message
-
-    if not voting_message:
+async def close_voting(gr):
+    if not gr.voting_message:
         return  # No voting message found
 
-    channel = client.get_channel(CHANNEL_ID)
+    channel = gr.channel
+    await gr.journal({"t": "end"})
 
-    # Disable voting buttons so no more votes can be cast
-    view = voting_message.view
+    # Disable voting buttons so no more votes can be cast, and write out the final tally
+    view = gr.voting_view
+    await gr.archive(view.tally() if view else {})
     if view:
-        for child in view.children:
-            child.disabled = True
-        await voting_message.edit(view=view)
+        view.close()
+        await gr.voting_message.edit(content="🔒 Voting has closed.", embed=view.render(), view=view)
 
     # Tally votes
-    vote_counts = voting_message.view.vote_counts if voting_message.view else None
+    vote_counts = view.tally() if view else None
     if not vote_counts:
-        await channel.send("⚠️ No votes were cast today.")
-        voting_message = None
+        await send_queue.send(channel, "⚠️ No votes were cast today.")
+        gr.voting_message = gr.voting_view = None
         return
 
     # Your "after voting ends" code goes here:
@@ -314,17 +2553,13 @@ async def end_voting():
     winners = [uid for uid, count in vote_counts.items() if count == max_votes]
 
     if max_votes == 0:
-        await channel.send("No votes received today.")
-        voting_message = None
+        await send_queue.send(channel, "No votes received today.")
+        gr.voting_message = gr.voting_view = None
         return
 
     # Award points to winners and send congrats message
-    scores = load_scores()
     for winner_uid in winners:
-        uid = str(winner_uid)
-        scores.setdefault(uid, {"insight_points": 0, "contribution_points": 0, "answered": []})
-        scores[uid]["insight_points"] += 1
-    save_scores(scores)
+        await run_io(store.increment, gr.guild_id, winner_uid, 1)
 
     winner_mentions = [f"<@{uid}>" for uid in winners]
     if len(winner_mentions) == 1:
@@ -339,33 +2574,204 @@ async def end_voting():
             f"As a reward, an ⭐ Insight point has been added to your scores."
         )
 
-    await channel.send(msg)
+    await send_queue.send(channel, msg, priority=PRIORITY_HIGH)
 
     # Reset voting state
-    voting_message = None
+    gr.voting_message = gr.voting_view = None
+
+# ------- SCHEDULER -------
+# One heap of (due_utc, seq, guild_id, generation, phase) entries replaces the per-phase
+# tasks.loop jobs. The run loop sleeps until the earliest entry (or until a guild is
+# (re)scheduled), fires every due phase GUILD_CONCURRENCY guilds at a time, and pushes that
+# phase's next occurrence in the guild's own time zone.
+#
+# Completed phases are recorded per guild and local date in PHASE_RUNS_FILE. After a restart,
+# a phase that is due today but was missed by less than PHASE_CATCHUP_WINDOW runs right away;
+# one that already ran is not repeated.
+#
+# SimulatedClock plus run_until drives a whole day through the scheduler without sleeping.
+
+PHASES = {
+    "purge": (time(hour=11, minute=50), purge_tracked),
+    "notify": (time(hour=11, minute=55), notify_guild),
+    "post": (time(hour=12, minute=0), post_question),
+    "warning": (time(hour=16, minute=50), warn_guild),
+    "close": (time(hour=17, minute=0), close_guild_submissions),
+    "start_voting": (time(hour=17, minute=5), open_voting),
+    "end_voting": (time(hour=18, minute=10), close_voting),
+}
+PHASE_RUNS_FILE = 'phase_runs.json'
+PHASE_CATCHUP_WINDOW = datetime.timedelta(minutes=int(os.getenv('PHASE_CATCHUP_MINUTES', 30)))
+
+class Clock:
+    def now(self):
+        return datetime.datetime.now(datetime.timezone.utc)
+
+class SimulatedClock(Clock):
+    def __init__(self, start):
+        self.current = start
+
+    def now(self):
+        return self.current
+
+    def advance_to(self, when):
+        self.current = max(self.current, when)
+
+def load_phase_runs():
+    try:
+        with open(PHASE_RUNS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except:
+        return {}
+
+class PhaseScheduler:
+    def __init__(self, clock):
+        self.clock = clock
+        self.heap = []
+        self.seq = itertools.count()
+        self.generations = {}  # guild_id -> generation; stale heap entries are skipped
+        self.runs = {}  # str(guild_id) -> {phase: local date it last ran}
+        self.wakeup = None
+        self.task = None
+        self.sem = None
+        self.firing = set()  # fire_all tasks still running; asyncio itself only keeps weak references
+
+    def occurrence(self, gr, phase, day):
+        at = PHASES[phase][0]
+        local = datetime.datetime.combine(day, at, tzinfo=gr.tz)
+        return local.astimezone(datetime.timezone.utc)
+
+    def push_next(self, gr, phase, after, catch_up=False):
+        day = after.astimezone(gr.tz).date()
+        due = self.occurrence(gr, phase, day)
+        ran_today = self.runs.get(str(gr.guild_id), {}).get(phase) == str(day)
+        missed = due <= after and not (catch_up and not ran_today and after - due <= PHASE_CATCHUP_WINDOW)
+        if missed or ran_today:
+            due = self.occurrence(gr, phase, day + datetime.timedelta(days=1))
+        elif due <= after:
+            due = after
+        gen = self.generations.get(gr.guild_id, 0)
+        heapq.heappush(self.heap, (due, next(self.seq), gr.guild_id, gen, phase))
+
+    def schedule_guild(self, gr, catch_up=True):
+        self.generations[gr.guild_id] = self.generations.get(gr.guild_id, 0) + 1
+        now = self.clock.now()
+        for phase in PHASES:
+            self.push_next(gr, phase, now, catch_up)
+        if self.wakeup:
+            self.wakeup.set()
+
+    async def start(self):
+        if self.task:
+            return
+        self.wakeup = asyncio.Event()
+        self.sem = asyncio.Semaphore(GUILD_CONCURRENCY)
+        self.runs = await run_io(load_phase_runs)
+        for gr in guild_rounds.values():
+            self.schedule_guild(gr)
+        self.task = asyncio.create_task(self.run())
+
+    def pop_due(self):
+        # -> list of (guild round, phase) due now; reschedules each one for its next day
+        now = self.clock.now()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, _, guild_id, gen, phase = heapq.heappop(self.heap)
+            gr = guild_rounds.get(guild_id)
+            if not gr or gen != self.generations.get(guild_id):
+                continue
+            due.append((gr, phase))
+            self.runs.setdefault(str(guild_id), {})[phase] = str(now.astimezone(gr.tz).date())
+            self.push_next(gr, phase, now + datetime.timedelta(seconds=1))
+        return due
+
+    async def fire(self, gr, phases):
+        # A guild's phases run in order (a catch-up can make purge, notify and post due together)
+        async with self.sem:
+            for phase in phases:
+                try:
+                    async with track(f"phase:{phase}"):
+                        if INTERACTIONS_MODE == "http":
+                            await gr.follow()  # every answer and vote up to now, before closing or tallying
+                        await PHASES[phase][1](gr)
+                except Exception as e:
+                    print(f"❌ Phase {phase} failed for guild {gr.guild_id}: {e}")
+
+    async def fire_all(self, due):
+        if not due:
+            return
+        await run_io(write_json_atomic, PHASE_RUNS_FILE, {g: dict(p) for g, p in self.runs.items()})
+        by_guild = {}
+        for gr, phase in due:
+            by_guild.setdefault(gr, []).append(phase)
+        await asyncio.gather(*(self.fire(gr, phases) for gr, phases in by_guild.items()))
+
+    async def run(self):
+        while True:
+            self.wakeup.clear()
+            timeout = None
+            if self.heap:
+                timeout = max(0.0, (self.heap[0][0] - self.clock.now()).total_seconds())
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+                continue  # a guild was (re)scheduled; recompute the next wake-up
+            except asyncio.TimeoutError:
+                pass
+            # Don't let a slow phase hold up the next due event
+            task = asyncio.create_task(self.fire_all(self.pop_due()))
+            self.firing.add(task)
+            task.add_done_callback(self.fired)
+
+    def fired(self, task):
+        self.firing.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"❌ Scheduled phases failed: {task.exception()}")
+
+    async def run_until(self, end):
+        # Simulated-clock mode: jump straight to each due event instead of sleeping
+        while self.heap and self.heap[0][0] <= end:
+            self.clock.advance_to(self.heap[0][0])
+            await self.fire_all(self.pop_due())
+        self.clock.advance_to(end)
+
+scheduler = PhaseScheduler(Clock())
+
 
+@client.event
+async def on_interaction(interaction):
+    if interaction.guild_id:
+        member_cache.remember(interaction.guild_id, interaction.user)
 
 @client.event
 async def on_message(msg):
+    if msg.guild:
+        member_cache.remember(msg.guild.id, msg.author)
+    gr = get_round(msg.guild.id) if msg.guild else None
+    if gr and msg.channel.id == gr.channel_id:
+        await run_io(append_purge_log, gr.purge_log, msg.id)
     if msg.author == client.user:
         return
     if msg.guild is None:
-        admin_ch = client.get_channel(ADMIN_CHANNEL_ID)
-        await admin_ch.send(f"📩 DM: {msg.content}")
+        # DMs aren't tied to a guild; they go to the bot owner's admin channel from the environment
+        if not ADMIN_CHANNEL_ID:
+            return
+        await admin_digest.notify(f"channel:{ADMIN_CHANNEL_ID}", f"📩 DM: {msg.content}")
         await msg.channel.send("✅ Received anonymously.")
 
 @tree.command(name="questionofthedaycommands", description="List available question commands")
+@instrumented("/questionofthedaycommands")
 async def question_commands(interaction):
     await interaction.response.send_message(
         "Commands:\n"
-        "/submitquestion\n/score\n/leaderboard\n/ranks\n\n"
+        "/submitquestion\n/score\n/leaderboard\n/ranks\n/history\n/myanswers\n\n"
         "ADMIN ONLY COMMANDS:\n"
-        "/removequestion\n/questionlist\n"
-        "/addinsightpoints\n/addcontributorpoints\n/removeinsightpoints\n/removecontributorpoints",
+        "/qotdsetup\n/removequestion\n/questionlist\n/pinquestion\n/schedulequestion\n/skipquestion\n"
+        "/addinsightpoints\n/addcontributorpoints\n/removeinsightpoints\n/removecontributorpoints\n/batchpoints\n/exportscores",
         ephemeral=True
     )
 
 @tree.command(name="ranks", description="View sushi ranks and point ranges")
+@instrumented("/ranks")
 async def ranks(interaction: discord.Interaction):
     ranks_description = """
 **Sushi Rank Tiers — Based on Total Points (⭐ + 💡):**
@@ -397,40 +2803,35 @@ class SubmitModal(Modal, title="Submit a Question"):
         super().__init__()
         self.user = user
 
+    @instrumented("SubmitModal.on_submit")
     async def on_submit(self, inter):
         try:
-            qs = load_questions()
-            ids = [int(x["id"]) for x in qs if "id" in x]
-            nid = str(max(ids) + 1 if ids else 1)
-            qs.append({"id": nid, "question": self.q.value, "submitter": str(self.user.id)})
-            save_questions(qs)
-
-            sc = load_scores()
-            uid = str(self.user.id)
-            today = str(datetime.date.today())
-            sc.setdefault(uid, {"insight_points": 0, "contribution_points": 0, "answered": [], "last_contrib": None})
-            if sc[uid]["last_contrib"] != today:
-                sc[uid]["contribution_points"] += 1
-                sc[uid]["last_contrib"] = today
-                save_scores(sc)
-                await inter.response.send_message(f"✅ Submitted! ID `{nid}` +1 contribution point", ephemeral=True)
+            # Held across check, add and claim so a double submit can't slip past the duplicate check
+            async with user_locks(str(self.user.id)):
+                exact, near = await run_io(duplicate_index.check, self.q.value)
+                if exact:
+                    # Same text once punctuation and case are ignored: no new question, no point
+                    await inter.response.send_message(f"⚠️ That question is already in the bank as ID `{exact[0]}`.", ephemeral=True)
+                    return
+
+                nid = await run_io(store.add_question, self.q.value, str(self.user.id))
+                await run_io(duplicate_index.add, nid, self.q.value)
+                claimed = await run_io(store.claim_contribution, inter.guild_id, self.user.id, str(datetime.date.today()))
+            similar = ", ".join(f"`{qid}` ({similarity:.0%})" for qid, similarity in near)
+            flag = f"\n⚠️ It looks similar to {similar}." if near else ""
+
+            if claimed:
+                await inter.response.send_message(f"✅ Submitted! ID `{nid}` +1 contribution point{flag}", ephemeral=True)
             else:
-                await inter.response.send_message(f"✅ Submitted! ID `{nid}` (already got today's point)", ephemeral=True)
+                await inter.response.send_message(f"✅ Submitted! ID `{nid}` (already got today's point){flag}", ephemeral=True)
 
             # --- Notify admins/mods here ---
-            guild = inter.guild
-            member = guild.get_member(self.user.id) if guild else None
-            display_name = member.display_name if member else f"{self.user.name}#{self.user.discriminator}"
-
-            notify_msg = f"🧠 @{display_name} has submitted a new question. Use /listquestions to view the question and use /removequestion if moderation is needed."
+            notify_msg = f"🧠 @{self.user.display_name} has submitted a new question. Use /listquestions to view the question and use /removequestion if moderation is needed."
+            if near:
+                notify_msg += f" Possible duplicate of {similar}."
 
             if NOTIFY_USER_ID:
-                notify_user = await client.fetch_user(NOTIFY_USER_ID)
-                if notify_user:
-                    try:
-                        await notify_user.send(notify_msg)
-                    except Exception as e:
-                        print(f"⚠️ Could not DM NOTIFY_USER_ID: {e}")
+                await notify_admins(f"dm:{NOTIFY_USER_ID}", notify_msg)
 
         except Exception as e:
             print(f"❌ Error in SubmitModal.on_submit: {e}")
@@ -438,33 +2839,73 @@ class SubmitModal(Modal, title="Submit a Question"):
 
 
 @tree.command(name="submitquestion", description="Submit a question")
+@instrumented("/submitquestion")
 async def submit_question(interaction):
     await interaction.response.send_modal(SubmitModal(interaction.user))
 
 from discord.ui import View, Button
 import discord
 
+# The list view only keeps its filters and the first id of each page it has shown; pages are
+# fetched on demand with a keyset query and shared between open views through question_pages,
+# which is keyed by store.question_version so a submission or removal makes old pages miss.
+# An HTTP worker only sees its own version bumps, so it reads every page fresh.
+
+QUESTIONS_PER_PAGE = 10
+QUESTION_PAGE_CACHE_SIZE = 64
+question_pages = OrderedDict()  # (version, submitter, status, after) -> page
+
+async def fetch_question_page(after, submitter, status):
+    if HTTP_WORKER:
+        return await run_io(store.question_page, after, QUESTIONS_PER_PAGE + 1, submitter, status)
+    key = (store.question_version, submitter, status, after)
+    page = question_pages.get(key)
+    if page is None:
+        page = question_pages[key] = await run_io(store.question_page, after, QUESTIONS_PER_PAGE + 1, submitter, status)
+        if len(question_pages) > QUESTION_PAGE_CACHE_SIZE:
+            question_pages.popitem(last=False)
+    else:
+        question_pages.move_to_end(key)
+    return page
+
 class QuestionListView(View):
-    def __init__(self, questions, page=0):
+    def __init__(self, submitter=None, status="active", total=0):
         super().__init__(timeout=180)
-        self.questions = questions
-        self.page = page
-        self.per_page = 10
-        self.max_page = (len(self.questions) - 1) // self.per_page
-        self.update_buttons()
+        self.submitter = submitter
+        self.status = status
+        self.total = total
+        self.starts = [0]  # for each page shown so far, the id the page starts after
+        self.has_next = False
+        self.last_id = 0
+
+    @property
+    def page(self):
+        return len(self.starts) - 1
+
+    async def seek(self, page, start=None):
+        # Rebuilds the view from custom-id state: `start` is the id the page starts after when
+        # known (earlier pages stay unknown), otherwise the pages are walked from the first one
+        if start is not None:
+            self.starts = [None] * page + [start]
+            return
+        while self.page < page:
+            rows = await fetch_question_page(self.starts[-1], self.submitter, self.status)
+            if len(rows) <= QUESTIONS_PER_PAGE:
+                break
+            self.starts.append(int(rows[QUESTIONS_PER_PAGE - 1]["id"]))
 
     def update_buttons(self):
         self.clear_items()
 
         prev = Button(label="Previous", style=discord.ButtonStyle.secondary, disabled=self.page == 0)
-        next = Button(label="Next", style=discord.ButtonStyle.secondary, disabled=self.page == self.max_page)
+        next = Button(label="Next", style=discord.ButtonStyle.secondary, disabled=not self.has_next)
 
         async def prev_callback(interaction):
-            self.page -= 1
+            self.starts.pop()
             await self.update_message(interaction)
 
         async def next_callback(interaction):
-            self.page += 1
+            self.starts.append(self.last_id)
             await self.update_message(interaction)
 
         prev.callback = prev_callback
@@ -473,68 +2914,119 @@ class QuestionListView(View):
         self.add_item(prev)
         self.add_item(next)
 
-    async def update_message(self, interaction):
-        start = self.page * self.per_page
-        end = start + self.per_page
-        current = self.questions[start:end]
-
+    async def render(self):
+        # One extra row is fetched to know whether a next page exists
+        rows = await fetch_question_page(self.starts[-1], self.submitter, self.status)
+        current = rows[:QUESTIONS_PER_PAGE]
+        self.has_next = len(rows) > QUESTIONS_PER_PAGE
+        self.last_id = int(current[-1]["id"]) if current else self.starts[-1]
+
+        lines = []
+        for q in current:
+            line = f"`{q['id']}`: {preview(q['question'])}"
+            if q.get("submitter"):
+                line += f" — submitted by <@{q['submitter']}>"
+            if q["status"] != "active":
+                line = f"~~{line}~~ ({q['status']})"
+            lines.append(line)
         embed = discord.Embed(
             title="📋 Question List",
-            description="\n".join(
-                f"`{q['id']}`: {q['question']} — submitted by <@{q['submitter']}>" if q.get("submitter") else f"`{q['id']}`: {q['question']}"
-                for q in current
-            ),
+            description="\n".join(lines) or "No questions on this page.",
             color=discord.Color.blue()
         )
-
-        embed.set_footer(text=f"Page {self.page + 1} of {self.max_page + 1}")
-
+        pages = max(1, -(-self.total // QUESTIONS_PER_PAGE))
+        embed.set_footer(text=f"Page {self.page + 1} of {pages} · {self.total} {self.status} questions")
         self.update_buttons()
-        await interaction.response.edit_message(embed=embed, view=self)
+        return embed
+
+    @instrumented("QuestionListView.update_message")
+    async def update_message(self, interaction):
+        await interaction.response.edit_message(embed=await self.render(), view=self)
 
 @tree.command(name="questionlist", description="Admin-only: list questions")
-async def question_list(interaction: discord.Interaction):
+@app_commands.describe(submitter="Only questions from this member", status="Which questions to show (default: active)")
+@app_commands.choices(status=[
+    app_commands.Choice(name="active", value="active"),
+    app_commands.Choice(name="removed", value="removed"),
+    app_commands.Choice(name="all", value="all"),
+])
+@instrumented("/questionlist")
+async def question_list(interaction: discord.Interaction, submitter: discord.User = None, status: str = "active"):
     if not is_admin(interaction):
         return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
-    questions = load_questions()
-    if not questions:
+    submitter_id = str(submitter.id) if submitter else None
+    total = await run_io(store.question_filter_count, submitter_id, status)
+    if not total:
         return await interaction.response.send_message("⚠️ No questions found.", ephemeral=True)
 
-    view = QuestionListView(questions)
-    embed = discord.Embed(
-        title="📋 Question List",
-        description="\n".join(f"`{q['id']}`: {q['question']}" for q in questions[:10]),
-        color=discord.Color.blue()
-    )
-    embed.set_footer(text=f"Page 1 of {(len(questions) - 1) // 10 + 1}")
-    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+    view = QuestionListView(submitter_id, status, total)
+    await interaction.response.send_message(embed=await view.render(), view=view, ephemeral=True)
 
 @tree.command(name="removequestion", description="Admin-only: remove question")
 @app_commands.describe(question_id="ID to remove")
+@instrumented("/removequestion")
 async def remove_question(interaction, question_id: str):
     if not is_admin(interaction):
         return await interaction.response.send_message("❌ No permission.", ephemeral=True)
-    qs = load_questions()
-    new = [q for q in qs if q["id"] != question_id]
-    if len(new)==len(qs):
+    if not await run_io(store.remove_question, question_id):
         return await interaction.response.send_message("⚠️ Not found.", ephemeral=True)
-    save_questions(new)
+    await run_io(duplicate_index.remove, question_id)
     await interaction.response.send_message(f"✅ Removed `{question_id}`.", ephemeral=True)
 
+@tree.command(name="pinquestion", description="Admin-only: post this question next")
+@app_commands.describe(question_id="ID to post next")
+@instrumented("/pinquestion")
+async def pin_question(interaction, question_id: str):
+    if not is_admin(interaction):
+        return await interaction.response.send_message("❌ No permission.", ephemeral=True)
+    if not question_id.isdigit() or not await run_io(question_queue.pin, interaction.guild_id, int(question_id)):
+        return await interaction.response.send_message("⚠️ Not found.", ephemeral=True)
+    await interaction.response.send_message(f"📌 `{question_id}` will be posted next.", ephemeral=True)
+
+@tree.command(name="schedulequestion", description="Admin-only: post a question on a given date")
+@app_commands.describe(question_id="ID to schedule", date="Date in YYYY-MM-DD")
+@instrumented("/schedulequestion")
+async def schedule_question(interaction, question_id: str, date: str):
+    if not is_admin(interaction):
+        return await interaction.response.send_message("❌ No permission.", ephemeral=True)
+    try:
+        day = datetime.date.fromisoformat(date)
+    except ValueError:
+        return await interaction.response.send_message("⚠️ Use the YYYY-MM-DD format.", ephemeral=True)
+    if not question_id.isdigit() or not await run_io(question_queue.schedule, interaction.guild_id, str(day), int(question_id)):
+        return await interaction.response.send_message("⚠️ Not found.", ephemeral=True)
+    await interaction.response.send_message(f"🗓️ `{question_id}` will be posted on {day}.", ephemeral=True)
+
+@tree.command(name="skipquestion", description="Admin-only: skip the next queued question")
+@instrumented("/skipquestion")
+async def skip_question(interaction):
+    if not is_admin(interaction):
+        return await interaction.response.send_message("❌ No permission.", ephemeral=True)
+    skipped = await run_io(question_queue.skip, interaction.guild_id)
+    if not skipped:
+        return await interaction.response.send_message("⚠️ The queue is empty.", ephemeral=True)
+    upcoming = await run_io(question_queue.peek, interaction.guild_id)
+    next_text = f" Next up: `{upcoming['id']}`." if upcoming else " The queue is now empty."
+    await interaction.response.send_message(f"⏭️ Skipped `{skipped['id']}`.{next_text}", ephemeral=True)
+
 @tree.command(name="score", description="Show your score")
+@instrumented("/score")
 async def score(interaction):
-    sc = load_scores().get(str(interaction.user.id),{"insight_points":0,"contribution_points":0})
+    sc = await run_io(store.get, interaction.guild_id, interaction.user.id)
     tot = sc["insight_points"]+sc["contribution_points"]
+    board = await ensure_leaderboard(interaction.guild_id)
+    pos = board.position("All", interaction.user.id)
+    place = f" | 📊 #{pos} of {board.count('All')}" if pos else ""
     await interaction.response.send_message(
-        f"⭐ {sc['insight_points']} | 💡 {sc['contribution_points']} | 🏆 {get_rank(tot)}",
+        f"⭐ {sc['insight_points']} | 💡 {sc['contribution_points']} | 🏆 {get_rank(tot)}{place}",
         ephemeral=False
     )
 
 # ------- LEADERBOARD with category select and pagination -------
 
 class CategorySelect(Select):
-    def __init__(self, inter, scores, page=0):
+    def __init__(self, inter, page=0):
         opts = [
             discord.SelectOption(label="All", description="Insight + Contribution"),
             discord.SelectOption(label="Insight", description="Insight only"),
@@ -542,45 +3034,27 @@ class CategorySelect(Select):
         ]
         super().__init__(placeholder="Pick a category…", min_values=1, max_values=1, options=opts)
         self.inter = inter
-        self.scores = scores
         self.page = page
 
+    @instrumented("CategorySelect.callback")
     async def callback(self, interaction):
         cat = self.values[0]
-        lb = []
-        if cat=="All":
-            for uid, s in self.scores.items():
-                ins,con = s.get("insight_points",0),s.get("contribution_points",0)
-                tot=ins+con
-                if tot>0: lb.append((uid,ins,con,tot))
-            lb.sort(key=lambda x:x[3],reverse=True)
-        elif cat=="Insight":
-            for uid,s in self.scores.items():
-                ins=s.get("insight_points",0)
-                if ins>0: lb.append((uid,ins))
-            lb.sort(key=lambda x:x[1],reverse=True)
-        else:
-            for uid,s in self.scores.items():
-                con=s.get("contribution_points",0)
-                if con>0: lb.append((uid,con))
-            lb.sort(key=lambda x:x[1],reverse=True)
-
         per=10
-        maxp=(len(lb)-1)//per if lb else 0
+        board = await ensure_leaderboard(interaction.guild_id)
+        total=board.count(cat)
+        maxp=(total-1)//per if total else 0
         self.page=max(0,min(self.page,maxp))
-        start,end=self.page*per,(self.page+1)*per
-        slice=lb[start:end]
+        rows=board.page(cat,self.page,per)
 
-        if not lb:
+        if not rows:
             desc="No entries."
         else:
             lines=[]
-            for i,e in enumerate(slice,start+1):
+            for i,uid,ins,con in rows:
                 if cat=="All":
-                    uid,ins,con,tot=e
-                    lines.append(f"{i}. <@{uid}> — {ins} ⭐ / {con} 💡 — {get_rank(tot)}")
+                    lines.append(f"{i}. <@{uid}> — {ins} ⭐ / {con} 💡 — {get_rank(ins+con)}")
                 else:
-                    uid,pt=e
+                    pt=ins if cat=="Insight" else con
                     em="⭐" if cat=="Insight" else "💡"
                     lines.append(f"{i}. <@{uid}> — {pt} {em} — {get_rank(pt)}")
             desc="\n".join(lines)
@@ -600,148 +3074,252 @@ class CategorySelect(Select):
         await interaction.response.edit_message(embed=embed,view=view)
 
 @tree.command(name="leaderboard", description="View the leaderboard")
+@instrumented("/leaderboard")
 async def leaderboard(interaction):
-    scores = load_scores()
     view = View(timeout=120)
-    view.add_item(CategorySelect(interaction, scores))
+    view.add_item(CategorySelect(interaction))
     await interaction.response.send_message("Select a category:", view=view, ephemeral=False)
 
+# ------- ANSWER HISTORY -------
+
+@tree.command(name="history", description="See a past question with its answers and votes")
+@app_commands.describe(day="Date as YYYY-MM-DD; leave empty to list recent days")
+@instrumented("/history")
+async def history(interaction, day: str = None):
+    if not day:
+        recent = await run_io(archive_recent_days, interaction.guild_id)
+        if not recent:
+            return await interaction.response.send_message("⚠️ Nothing has been archived yet.", ephemeral=True)
+        lines = [
+            f"`{d}` — {preview(entry['question'] or 'Unknown question', 120)} ({entry['answers']} answers, {plural_votes(entry['votes'])})"
+            for d, entry in recent
+        ]
+        embed = discord.Embed(title="📚 Recent questions", description="\n".join(lines), color=discord.Color.blue())
+        embed.set_footer(text="Use /history day:YYYY-MM-DD for the answers")
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    try:
+        day = str(datetime.date.fromisoformat(day))
+    except ValueError:
+        return await interaction.response.send_message("⚠️ Use a date like 2025-06-25.", ephemeral=True)
+    records = await run_io(read_archive_segment, interaction.guild_id, day)
+    if not records:
+        return await interaction.response.send_message(f"⚠️ No archived question for {day}.", ephemeral=True)
+
+    question = next((r for r in records if r["t"] == "question"), {})
+    result = next((r for r in records if r["t"] == "result"), {"winners": []})
+    answers = sorted((r for r in records if r["t"] == "answer"), key=lambda r: -r["votes"])
+    lines = []
+    for r in answers[:BALLOT_PAGE_SIZE]:
+        who = "Anonymous" if r["anonymous"] else f"<@{r['uid']}>"
+        medal = "🏆 " if r.get("uid") in result["winners"] else ""
+        lines.append(f"{medal}{who} — {plural_votes(r['votes'])}\n{preview(r['answer'])}")
+    if len(answers) > BALLOT_PAGE_SIZE:
+        lines.append(f"…and {len(answers) - BALLOT_PAGE_SIZE} more answers")
+    embed = discord.Embed(
+        title=f"📚 {day}: {preview(question.get('question') or 'Unknown question', 200)}",
+        description="\n\n".join(lines) or "No answers.",
+        color=discord.Color.blue()
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@tree.command(name="myanswers", description="See your own recent answers")
+@instrumented("/myanswers")
+async def my_answers(interaction):
+    found = await run_io(archive_user_answers, interaction.guild_id, str(interaction.user.id))
+    if not found:
+        return await interaction.response.send_message("⚠️ No archived answers from you yet.", ephemeral=True)
+    lines = []
+    for day, question, r in found:
+        outcome = "anonymous" if r["anonymous"] else plural_votes(r["votes"])
+        lines.append(f"`{day}` {preview(question or 'Unknown question', 100)}\n➡️ {preview(r['answer'])} ({outcome})")
+    embed = discord.Embed(title="🗂️ Your recent answers", description="\n\n".join(lines), color=discord.Color.blue())
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 # ------- ADMIN POINT COMMANDS -------
 
+@tree.command(name="qotdsetup", description="Admin: set this server's question and admin channels")
+@app_commands.describe(
+    channel="Channel for the daily question",
+    admin_channel="Channel for anonymous answers and notices",
+    timezone="IANA time zone for the daily schedule, e.g. Europe/Berlin"
+)
+@instrumented("/qotdsetup")
+async def qotd_setup(interaction, channel: discord.TextChannel, admin_channel: discord.TextChannel = None, timezone: str = None):
+    if not is_admin(interaction):
+        return await interaction.response.send_message("❌ No permission.",ephemeral=True)
+    try:
+        tz = ZoneInfo(timezone) if timezone else None
+    except (KeyError, ValueError):
+        return await interaction.response.send_message(f"⚠️ Unknown time zone `{timezone}`.",ephemeral=True)
+    gr = get_round(interaction.guild_id)
+    if gr:
+        gr.channel_id = channel.id
+        gr.admin_channel_id = admin_channel.id if admin_channel else channel.id
+        if tz:
+            gr.timezone, gr.tz = timezone, tz
+    else:
+        gr = guild_rounds[interaction.guild_id] = GuildRound(
+            interaction.guild_id, channel.id, admin_channel.id if admin_channel else None, timezone
+        )
+    await run_io(save_guild_config)
+    scheduler.schedule_guild(gr, catch_up=False)
+    await interaction.response.send_message(
+        f"✅ Questions will be posted in {channel.mention} on {gr.timezone} time; notices go to <#{gr.admin_channel_id}>.", ephemeral=True
+    )
+
+@tree.command(name="batchpoints", description="Admin: apply point changes from a CSV or JSON file")
+@app_commands.describe(file="CSV or JSON with uid, insight_points, contribution_points and optional mode (add/set)")
+@instrumented("/batchpoints")
+async def batch_points(interaction, file: discord.Attachment):
+    if not is_admin(interaction):
+        return await interaction.response.send_message("❌ No permission.",ephemeral=True)
+    await interaction.response.defer(ephemeral=True)
+    try:
+        text = (await file.read()).decode("utf-8-sig")
+        adjustments = parse_adjustments(text, file_format(file.filename))
+    except (ValueError, UnicodeDecodeError) as e:
+        return await interaction.followup.send(f"⚠️ Could not read `{file.filename}`: {e}", ephemeral=True)
+    count = await run_io(store.apply_adjustments, interaction.guild_id, adjustments)
+    await interaction.followup.send(f"✅ Applied {count} point changes from `{file.filename}`.", ephemeral=True)
+
+@tree.command(name="exportscores", description="Admin: download this server's scores as CSV or JSON")
+@app_commands.describe(format="csv (default) or json")
+@app_commands.choices(format=[app_commands.Choice(name="csv", value="csv"), app_commands.Choice(name="json", value="json")])
+@instrumented("/exportscores")
+async def export_scores_command(interaction, format: str = "csv"):
+    if not is_admin(interaction):
+        return await interaction.response.send_message("❌ No permission.",ephemeral=True)
+    await interaction.response.defer(ephemeral=True)
+    # Stream to a temp file on the I/O thread rather than building the export in memory
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    os.close(fd)
+    try:
+        await run_io(export_scores_file, path, interaction.guild_id)
+        filename = f"qotd-scores-{datetime.date.today()}.{format}"
+        await interaction.followup.send("📦 Score export:", file=discord.File(path, filename=filename), ephemeral=True)
+    finally:
+        os.remove(path)
+
 @tree.command(name="addinsightpoints", description="Admin: add insight points")
 @app_commands.describe(user="Mention user", amount="Points to add")
+@instrumented("/addinsightpoints")
 async def add_insight(interaction, user: discord.Member, amount: int):
     if not is_admin(interaction):
         return await interaction.response.send_message("❌ No permission.",ephemeral=True)
-    sc=load_scores();uid=str(user.id)
-    sc.setdefault(uid,{"insight_points":0,"contribution_points":0,"answered":[]})
-    sc[uid]["insight_points"]+=amount; save_scores(sc)
-    await interaction.response.send_message(f"✅ +{amount} insight to {user.mention}",ephemeral=True)
+    insight, _ = await run_io(store.increment,interaction.guild_id,user.id,amount,0)
+    await interaction.response.send_message(f"✅ +{amount} insight to {user.mention} (now ⭐ {insight})",ephemeral=True)
 
 @tree.command(name="addcontributorpoints", description="Admin: add contribution points")
 @app_commands.describe(user="Mention user", amount="Points to add")
+@instrumented("/addcontributorpoints")
 async def add_contrib(interaction, user: discord.Member, amount: int):
     if not is_admin(interaction):
         return await interaction.response.send_message("❌ No permission.",ephemeral=True)
-    sc=load_scores();uid=str(user.id)
-    sc.setdefault(uid,{"insight_points":0,"contribution_points":0,"answered":[]})
-    sc[uid]["contribution_points"]+=amount; save_scores(sc)
-    await interaction.response.send_message(f"✅ +{amount} contribution to {user.mention}",ephemeral=True)
+    _, contribution = await run_io(store.increment,interaction.guild_id,user.id,0,amount)
+    await interaction.response.send_message(f"✅ +{amount} contribution to {user.mention} (now 💡 {contribution})",ephemeral=True)
 
 @tree.command(name="removeinsightpoints", description="Admin: remove insight points")
 @app_commands.describe(user="Mention user", amount="Points to remove")
+@instrumented("/removeinsightpoints")
 async def remove_insight(interaction, user: discord.Member, amount: int):
     if not is_admin(interaction):
         return await interaction.response.send_message("❌ No permission.",ephemeral=True)
-    sc=load_scores();uid=str(user.id)
-    sc.setdefault(uid,{"insight_points":0,"contribution_points":0,"answered":[]})
-    sc[uid]["insight_points"]=max(0,sc[uid]["insight_points"]-amount); save_scores(sc)
-    await interaction.response.send_message(f"✅ -{amount} insight from {user.mention}",ephemeral=True)
+    insight, _ = await run_io(store.increment,interaction.guild_id,user.id,-amount,0)
+    await interaction.response.send_message(f"✅ -{amount} insight from {user.mention} (now ⭐ {insight})",ephemeral=True)
 
 @tree.command(name="removecontributorpoints", description="Admin: remove contribution points")
 @app_commands.describe(user="Mention user", amount="Points to remove")
+@instrumented("/removecontributorpoints")
 async def remove_contrib(interaction, user: discord.Member, amount: int):
     if not is_admin(interaction):
         return await interaction.response.send_message("❌ No permission.",ephemeral=True)
-    sc=load_scores();uid=str(user.id)
-    sc.setdefault(uid,{"insight_points":0,"contribution_points":0,"answered":[]})
-    sc[uid]["contribution_points"]=max(0,sc[uid]["contribution_points"]-amount); save_scores(sc)
-    await interaction.response.send_message(f"✅ -{amount} contribution from {user.mention}",ephemeral=True)
+    _, contribution = await run_io(store.increment,interaction.guild_id,user.id,0,-amount)
+    await interaction.response.send_message(f"✅ -{amount} contribution from {user.mention} (now 💡 {contribution})",ephemeral=True)
 @tree.command(name="start_test_sequence", description="Admin only: Run full test sequence for question flow")
+@instrumented("/start_test_sequence")
 async def start_test_sequence(interaction: discord.Interaction):
-    global submission_open, voting_message, voting_view, answer_log
     if not is_admin(interaction):
         return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
-    channel = client.get_channel(CHANNEL_ID)
+    gr = get_round(interaction.guild_id)
+    channel = gr.channel if gr else None
     if channel is None:
         return await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
 
-    submission_open = True
-    voting_message = None
-    voting_view = None
-    answer_log = {}
+    await gr.start(None, None)
 
     await interaction.response.send_message("🚦 Starting full test sequence...", ephemeral=False)
 
-    await channel.purge(limit=1000)
-    await channel.send("🧹 Channel purged for test.")
+    await purge_tracked(gr)
+    await send_queue.send(channel, "🧹 Channel purged for test.", priority=PRIORITY_LOW)
     await asyncio.sleep(2)
 
-    await channel.send("⏳ The next question will be posted soon!")
+    await send_queue.send(channel, "⏳ The next question will be posted soon!", priority=PRIORITY_LOW)
     await asyncio.sleep(5)
 
-    await post_question()
+    await post_question(gr, preview=True)
     await asyncio.sleep(3)
 
-    await channel.send("You can now answer freely or anonymously using the buttons.")
+    await send_queue.send(channel, "You can now answer freely or anonymously using the buttons.", priority=PRIORITY_LOW)
     await asyncio.sleep(15)
 
-    await channel.send("⏳ Submissions will close in 10 minutes! Get your answers in quickly!")
+    await send_queue.send(channel, "⏳ Submissions will close in 10 minutes! Get your answers in quickly!", priority=PRIORITY_LOW)
     await asyncio.sleep(10)
 
-    submission_open = False
-    await channel.send("🔒 Submissions are now closed for today's question. Voting will begin in 5 minutes Thank you!")
+    gr.submission_open = False
+    await gr.journal({"t": "close"})
+    if gr.answer_digest:
+        gr.answer_digest.schedule_render()
+    await send_queue.send(channel, "🔒 Submissions are now closed for today's question. Voting will begin in 5 minutes Thank you!", priority=PRIORITY_LOW)
     await asyncio.sleep(10)
 
     # Prepare answers for voting
-    guild = client.get_guild(GUILD_ID)
-    answers = []
-    for uid, data in answer_log.items():
-        if not data["anonymous"]:
-            member = guild.get_member(int(uid))
-            display_name = member.display_name if member else f"User {uid}"
-            answers.append((uid, display_name, data["answer"]))
+    answers = [(uid, record.answer) for uid, record in gr.answer_log.items() if not record.anonymous]
 
     if not answers:
-        await channel.send("⚠️ No answers submitted to vote on. Note - anonymous answers are not eligible for voting")
+        await send_queue.send(channel, "⚠️ No answers submitted to vote on. Note - anonymous answers are not eligible for voting", priority=PRIORITY_LOW)
         return
 
-    voting_view = VotingView(answers)  # Save VotingView instance to global
-    voting_message = await channel.send(
-        "\n".join(
-            [
-                "Vote for the best answer!",
-                *[
-                    f"Answer #{idx} - submitted by <@{uid}>: \"{ans}\""
-                    for idx, (uid, display_name, ans) in enumerate(answers, start=1)
-                ],
-            ]
-        ),
+    voting_view = gr.voting_view = VotingView(answers, gr)
+    voting_message = gr.voting_message = voting_view.message = await send_queue.send(
+        channel,
+        f"Vote for the best answer! {len(answers)} answers are on the ballot.",
+        priority=PRIORITY_HIGH,
+        embed=voting_view.render(),
         view=voting_view,
     )
-    await channel.send("🗳️ Voting started! Click buttons to vote.")
+    await gr.journal({"t": "voting", "message_id": voting_message.id, "answers": voting_view.entries()})
+    await send_queue.send(channel, "🗳️ Voting started! Press Open ballot to vote.", priority=PRIORITY_LOW)
 
     await asyncio.sleep(15)
 
     if voting_message and voting_view:
-        for child in voting_view.children:
-            child.disabled = True
-        await voting_message.edit(view=voting_view)
+        gr.voting_message = gr.voting_view = None
+        await gr.journal({"t": "end"})
+        await gr.archive(voting_view.tally())
+        voting_view.close()
+        await voting_message.edit(content="🔒 Voting has closed.", embed=voting_view.render(), view=voting_view)
 
-        vote_counts = voting_view.vote_counts
+        vote_counts = voting_view.tally()
         if not vote_counts:
-            await channel.send("⚠️ No votes were cast today.")
+            await send_queue.send(channel, "⚠️ No votes were cast today.", priority=PRIORITY_LOW)
             return
 
         max_votes = max(vote_counts.values())
         winners = [uid for uid, count in vote_counts.items() if count == max_votes]
 
         if max_votes == 0:
-            await channel.send("No votes received today.")
+            await send_queue.send(channel, "No votes received today.", priority=PRIORITY_LOW)
             return
 
-        scores = load_scores()
         for winner_uid in winners:
-            uid = str(winner_uid)
-            scores.setdefault(uid, {"insight_points": 0, "contribution_points": 0, "answered": []})
-            scores[uid]["insight_points"] += 1
-        save_scores(scores)
+            await run_io(store.increment, gr.guild_id, winner_uid, 1)
 
         winner_names = []
         for uid in winners:
-            member = guild.get_member(int(uid))
-            winner_names.append(f"@{member.display_name}" if member else f"User {uid}")
+            record = gr.answer_log.get(int(uid))
+            winner_names.append(f"@{member_cache.display_name(gr.guild_id, uid, record.name if record else None)}")
 
         if len(winner_names) == 1:
             msg = (
@@ -755,9 +3333,437 @@ async def start_test_sequence(interaction: discord.Interaction):
                 f"As a reward, an ⭐ Insight point has been added to your scores."
             )
 
-        await channel.send(msg)
+        await send_queue.send(channel, msg, priority=PRIORITY_HIGH)
     else:
-        await channel.send("⚠️ Voting message missing or no votes to tally.")
+        await send_queue.send(channel, "⚠️ Voting message missing or no votes to tally.", priority=PRIORITY_LOW)
+
+# ------- HTTP INTERACTIONS -------
+# `python main.py serve-interactions` answers Discord's interactions webhook: point the app's
+# Interactions Endpoint URL at HTTP_PATH and run the bot itself with INTERACTIONS_MODE=http.
+# Each POST's Ed25519 signature is checked against DISCORD_PUBLIC_KEY, then one of
+# HTTP_WORKERS pre-forked processes (sharing the listening socket and the SQLite store) runs
+# the same handlers as gateway mode against an HttpInteraction and returns the handler's reply
+# as the HTTP response. Round state comes from the guild journals; what has to reach Discord
+# afterwards (answer echoes, the digest, the tally) is sent by the gateway process as it
+# follows the journals; admin notices come through the notice relay. Transient components get custom ids that carry their
+# state, since no worker keeps the view around. Workers re-read guilds.json whenever it changes.
+#
+# Commands that change the gateway process's own state (setup, the question queue, a test run)
+# or deal in files are relayed instead: the worker checks the caller is an admin, appends the
+# interaction to a per-day file under COMMAND_DIR and defers the reply. The gateway picks it
+# up on its next journal follow, runs the same handler against an HttpInteraction and answers
+# through the interaction's webhook (followups included), which Discord keeps open for
+# INTERACTION_TOKEN_SECONDS; commands older than that are dropped rather than run unanswered.
+
+DISCORD_PUBLIC_KEY = os.getenv('DISCORD_PUBLIC_KEY')
+HTTP_HOST = os.getenv('HTTP_HOST', '127.0.0.1')
+HTTP_PORT = int(os.getenv('HTTP_PORT', 8080))
+HTTP_WORKERS = int(os.getenv('HTTP_WORKERS', os.cpu_count() or 2))
+HTTP_PATH = '/interactions'
+WORKER_CACHE_TTL = 30  # seconds a worker's leaderboard may lag score changes made by other processes
+RELAYED_COMMANDS = {
+    "qotdsetup", "pinquestion", "schedulequestion", "skipquestion",
+    "batchpoints", "exportscores", "start_test_sequence",
+}
+COMMAND_DIR = 'relayed_commands'
+COMMAND_STATE_FILE = os.path.join(COMMAND_DIR, 'forwarded.json')
+INTERACTION_TOKEN_SECONDS = 15 * 60
+PING, APPLICATION_COMMAND, MESSAGE_COMPONENT, MODAL_SUBMIT = 1, 2, 3, 5  # interaction types
+PONG, MESSAGE, DEFERRED_MESSAGE, DEFERRED_UPDATE, UPDATE_MESSAGE, MODAL = 1, 4, 5, 6, 7, 9  # response types
+HTTP_WORKER = False  # True inside the worker processes
+
+class HttpUser:
+    def __init__(self, user, member=None):
+        member = member or {}
+        self.id = int(user["id"])
+        self.name = user.get("username")
+        self.global_name = user.get("global_name")
+        self.display_name = member.get("nick") or self.global_name or self.name
+        self.mention = f"<@{self.id}>"
+        self.bot = user.get("bot", False)
+        self.guild_permissions = discord.Permissions(int(member.get("permissions", 0)))
+
+class HttpChannel:
+    def __init__(self, channel):
+        self.id = int(channel["id"])
+        self.name = channel.get("name")
+        self.mention = f"<#{self.id}>"
+
+class HttpResponse:
+    # Stands in for discord.InteractionResponse: the first reply becomes the HTTP response body
+    def __init__(self, kind):
+        self.kind = kind
+        self.body = None
+
+    def is_done(self):
+        return self.body is not None
+
+    def reply(self, kind, data=None):
+        if self.body is not None:
+            raise RuntimeError("This interaction has already been responded to")
+        self.body = {"type": kind} if data is None else {"type": kind, "data": data}
+
+    async def send_message(self, content=None, *, embed=None, view=None, ephemeral=False, **kwargs):
+        self.reply(MESSAGE, http_message(content, embed, view, ephemeral))
+
+    async def edit_message(self, *, content=None, embed=None, view=None, **kwargs):
+        self.reply(UPDATE_MESSAGE, http_message(content, embed, view))
+
+    async def send_modal(self, modal):
+        self.reply(MODAL, http_modal(modal))
+
+    async def defer(self, *, ephemeral=False, **kwargs):
+        # Components and modals opened from a message are acknowledged without a new message
+        if self.kind == APPLICATION_COMMAND:
+            self.reply(DEFERRED_MESSAGE, http_message(ephemeral=ephemeral) or None)
+        else:
+            self.reply(DEFERRED_UPDATE)
+
+class RelayedResponse:
+    # The worker already deferred a relayed command, so the handler's reply replaces the
+    # "thinking…" message through the interaction's webhook; followups go through the same one
+    def __init__(self, hook):
+        self.hook = hook
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def send_message(self, content=None, *, embed=None, ephemeral=False, **kwargs):
+        self.done = True
+        await self.hook.edit_message("@original", content=content, embed=embed)
+
+    async def defer(self, **kwargs):
+        self.done = True
+
+class HttpInteraction:
+    def __init__(self, payload):
+        self.payload = payload
+        self.id = int(payload["id"])
+        self.type = payload["type"]
+        self.data = payload.get("data") or {}
+        self.guild_id = int(payload["guild_id"]) if payload.get("guild_id") else None
+        member = payload.get("member")
+        self.user = HttpUser(member["user"] if member else payload["user"], member)
+        self.response = HttpResponse(self.type)
+        self.followup = None  # set by relayed_interaction; workers only ever reply once
+
+    def options(self):
+        # -> the command's options as handler keyword arguments; users, channels and files come
+        # from the resolved data
+        resolved = self.data.get("resolved", {})
+        kwargs = {}
+        for option in self.data.get("options", []):
+            value = option["value"]
+            if option["type"] == discord.AppCommandOptionType.user.value:
+                value = HttpUser(resolved["users"][value], resolved.get("members", {}).get(value))
+            elif option["type"] == discord.AppCommandOptionType.channel.value:
+                value = HttpChannel(resolved["channels"][value])
+            elif option["type"] == discord.AppCommandOptionType.attachment.value:
+                value = discord.Attachment(data=resolved["attachments"][value], state=client._connection)
+            kwargs[option["name"]] = value
+        return kwargs
+
+    def text_input(self):
+        # -> what was typed into the modal's text input (every modal here has exactly one)
+        return self.data["components"][0]["components"][0]["value"]
+
+def http_message(content=None, embed=None, view=None, ephemeral=False):
+    data = {}
+    if content is not None:
+        data["content"] = content
+    if embed is not None:
+        data["embeds"] = [embed.to_dict()]
+    if view is not None:
+        data["components"] = http_components(view)
+    if ephemeral:
+        data["flags"] = discord.MessageFlags(ephemeral=True).value
+    return data
+
+def http_components(view):
+    items = view.children
+    if isinstance(view, BallotView):
+        items[0].custom_id = f"qotd:ballot:vote:{view.page}"
+        for button in items[1:]:
+            button.custom_id = f"qotd:ballot:page:{button.page}"
+    elif items and isinstance(items[0], CategorySelect):
+        select = items[0]
+        select.custom_id = f"qotd:lb:{select.page}"
+        if len(items) == 3:  # a category is showing: its previous and next page
+            category = select.values[0]
+            items[1].custom_id = f"qotd:lb:{category}:{select.page - 1}"
+            items[2].custom_id = f"qotd:lb:{category}:{select.page + 1}"
+    elif isinstance(view, QuestionListView):
+        state = f"qotd:ql:{view.status}:{view.submitter or ''}"
+        before = view.starts[-2] if view.page else None
+        items[0].custom_id = f"{state}:{view.page - 1}:{'' if before is None else before}"
+        items[1].custom_id = f"{state}:{view.page + 1}:{view.last_id}"
+    return view.to_components()
+
+def http_modal(modal):
+    if isinstance(modal, AnswerModal):
+        modal.custom_id = f"qotd:modal:answer:{modal.qid}"
+    elif isinstance(modal, AnonModal):
+        modal.custom_id = f"qotd:modal:anon:{modal.qid}"
+    else:
+        modal.custom_id = "qotd:modal:submit"
+    return modal.to_dict()
 
+worker_config = {"version": None}  # (inode, mtime) of the guilds.json this worker last read
 
-client.run(TOKEN)
+def changed_guild_config():
+    # -> guilds.json when the gateway has rewritten it since the last call, else None
+    try:
+        st = os.stat(GUILDS_FILE)
+        version = (st.st_ino, st.st_mtime_ns)
+    except FileNotFoundError:
+        version = None
+    if version == worker_config["version"]:
+        return None
+    worker_config["version"] = version
+    return load_guild_config()
+
+async def worker_round(guild_id):
+    config = await run_io(changed_guild_config)  # a /qotdsetup since this worker last looked
+    for gid, cfg in (config or {}).items():
+        configure_guild(gid, cfg)
+    gr = guild_rounds.get(guild_id)
+    if gr:
+        await gr.refresh()
+    return gr
+
+async def dispatch_interaction(inter, gr):
+    data = inter.data
+    if inter.type == APPLICATION_COMMAND:
+        name = data["name"]
+        command = tree.get_command(name)
+        if command is None:
+            return await inter.response.send_message(f"⚠️ Unknown command /{name}.", ephemeral=True)
+        if name in RELAYED_COMMANDS:
+            if not is_admin(inter):
+                return await inter.response.send_message("❌ No permission.", ephemeral=True)
+            await run_io(command_relay.write, inter.payload)
+            return await inter.response.defer(ephemeral=True)
+        return await command.callback(inter, **inter.options())
+
+    kind, _, rest = data["custom_id"].removeprefix("qotd:").partition(":")
+    if inter.type == MODAL_SUBMIT:
+        form, _, qid = rest.partition(":")
+        if form == "answer":
+            modal = AnswerModal(int(qid), inter.user)
+        elif form == "anon":
+            modal = AnonModal(int(qid), inter.user)
+        else:
+            modal = SubmitModal(inter.user)
+        modal.children[0]._value = inter.text_input()
+        return await modal.on_submit(inter)
+
+    if kind == "answer":
+        if not gr or not gr.submission_open or gr.qid is None:
+            return await inter.response.send_message("❌ Submissions are closed for today.", ephemeral=True)
+        view = QuestionView(gr.qid)
+        return await (view.freely if rest == "free" else view.anon).callback(inter)
+
+    if kind == "ballot":
+        voting = gr.voting_view if gr else None
+        if voting is None:
+            return await inter.response.send_message("Voting has ended.", ephemeral=True)
+        action, _, page = rest.partition(":")
+        if action == "open":
+            return await voting.children[0].callback(inter)
+        page = int(page)
+        if action == "page":
+            return await inter.response.edit_message(embed=voting.page_embed(page), view=BallotView(voting, page))
+        select = BallotView(voting, page).children[0]
+        select._values = data["values"]
+        return await select.callback(inter)
+
+    if kind == "lb":
+        *category, page = rest.split(":")
+        select = CategorySelect(None, int(page))
+        select._values = category or data["values"]
+        return await select.callback(inter)
+
+    if kind == "ql":
+        if not is_admin(inter):
+            return await inter.response.send_message("❌ No permission.", ephemeral=True)
+        status, submitter, page, start = rest.split(":")
+        submitter = submitter or None
+        view = QuestionListView(submitter, status, await run_io(store.question_filter_count, submitter, status))
+        await view.seek(int(page), int(start) if start else None)
+        return await view.update_message(inter)
+
+    await inter.response.send_message("⚠️ This control is no longer active.", ephemeral=True)
+
+async def handle_interaction(payload):
+    # -> the interaction response to send back
+    if payload["type"] == PING:
+        return {"type": PONG}
+    inter = HttpInteraction(payload)
+    if inter.guild_id is None:
+        return {"type": MESSAGE, "data": http_message("⚠️ Use this in a server.", ephemeral=True)}
+    board = leaderboards.get(str(inter.guild_id))
+    if board and board.built and tm.monotonic() - board.built_at > WORKER_CACHE_TTL:
+        board.reset()
+    try:
+        await dispatch_interaction(inter, await worker_round(inter.guild_id))
+    except Exception as e:
+        print(f"❌ HTTP interaction {inter.data.get('name') or inter.data.get('custom_id')} failed: {e}")
+    if not inter.response.is_done():
+        await inter.response.send_message("❌ Something went wrong.", ephemeral=True)
+    return inter.response.body
+
+def relayed_interaction(payload):
+    # The webhook discord.Interaction.followup would give, on the gateway's own HTTP session
+    inter = HttpInteraction(payload)
+    hook = discord.Webhook.from_state({"id": payload["application_id"], "type": 3, "token": payload["token"]}, client._connection)
+    inter.response = RelayedResponse(hook)
+    inter.followup = hook
+    return inter
+
+async def run_relayed_command(payload):
+    inter = relayed_interaction(payload)
+    name = inter.data["name"]
+    try:
+        await tree.get_command(name).callback(inter, **inter.options())
+    finally:
+        if not inter.response.is_done():
+            await inter.response.send_message("❌ Something went wrong.", ephemeral=True)
+
+class CommandRelay(NoticeRelay):
+    # Same files and offsets as the notice relay; each line is a whole interaction payload
+    def __init__(self):
+        super().__init__(COMMAND_DIR, COMMAND_STATE_FILE)
+        self.running = set()
+
+    async def deliver(self, payload):
+        age = discord.utils.utcnow() - discord.utils.snowflake_time(int(payload["id"]))
+        if age.total_seconds() > INTERACTION_TOKEN_SECONDS:
+            print(f"⚠️ Dropped a relayed /{payload['data']['name']} from {age.total_seconds() / 60:.0f} minutes ago; its interaction has expired")
+            return
+        # Each command is its own task, so a test sequence doesn't hold up the journal follow
+        task = asyncio.create_task(run_relayed_command(payload))
+        self.running.add(task)
+        task.add_done_callback(self.finished)
+
+    def finished(self, task):
+        self.running.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"❌ Relayed command failed: {task.exception()}")
+
+command_relay = CommandRelay()
+
+def interactions_app(loop):
+    # Only the workers need Flask and PyNaCl, so gateway mode runs without them
+    from flask import Flask, request, jsonify, abort
+    from nacl.signing import VerifyKey
+    from nacl.exceptions import BadSignatureError
+
+    key = VerifyKey(bytes.fromhex(DISCORD_PUBLIC_KEY))
+    app = Flask(__name__)
+
+    @app.post(HTTP_PATH)
+    def interactions():
+        body = request.get_data()
+        try:
+            key.verify(request.headers["X-Signature-Timestamp"].encode() + body, bytes.fromhex(request.headers["X-Signature-Ed25519"]))
+        except (KeyError, ValueError, BadSignatureError):
+            abort(401, "invalid request signature")
+        return jsonify(loop.run_until_complete(handle_interaction(json.loads(body))))
+
+    return app
+
+def run_worker(sock, host, port):
+    global HTTP_WORKER, bot_loop
+    from werkzeug.serving import make_server
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent stops us on Ctrl+C
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    HTTP_WORKER = True
+    duplicate_index.shared = True
+    bot_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(bot_loop)
+    make_server(host, port, interactions_app(bot_loop), fd=sock.fileno()).serve_forever()
+
+def serve_interactions(host=HTTP_HOST, port=HTTP_PORT, workers=HTTP_WORKERS):
+    if STORAGE_BACKEND != 'sqlite':
+        sys.exit("❌ HTTP workers share the SQLite store; set STORAGE_BACKEND=sqlite")
+    if not DISCORD_PUBLIC_KEY:
+        sys.exit("❌ DISCORD_PUBLIC_KEY not set!")
+    # Create or migrate the database once here; every worker opens its own connection after the fork
+    store.load()
+    store.db.close()
+    store.db = None
+
+    sock = socket.create_server((host, port), backlog=1024)
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=run_worker, args=(sock, host, port), daemon=True) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    print(f"🌐 Serving interactions on http://{host}:{port}{HTTP_PATH} with {workers} workers")
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            p.terminate()
+            p.join()
+
+def handle_sigterm(signum, frame):
+    # client.run only cleans up on KeyboardInterrupt, so route SIGTERM through it
+    raise KeyboardInterrupt
+
+def run_cli(argv):
+    # python main.py import-scores FILE | export-scores FILE [--guild ID] | serve-interactions
+    parser = argparse.ArgumentParser(prog="main.py", description="Question of the Day bot")
+    sub = parser.add_subparsers(dest="command")
+    imp = sub.add_parser("import-scores", help="apply a CSV/JSON batch of point changes")
+    imp.add_argument("file")
+    exp = sub.add_parser("export-scores", help="write a guild's scores as CSV/JSON")
+    exp.add_argument("file", help="output path; .json writes JSON, anything else CSV")
+    exp.add_argument("--format", choices=["csv", "json"])
+    for cmd in (imp, exp):
+        cmd.add_argument("--guild", help="guild whose scores to use (default: GUILD_ID, or the only configured guild)")
+    srv = sub.add_parser("serve-interactions", help="answer Discord's interactions webhook with a pool of workers")
+    srv.add_argument("--host", default=HTTP_HOST)
+    srv.add_argument("--port", type=int, default=HTTP_PORT)
+    srv.add_argument("--workers", type=int, default=HTTP_WORKERS)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve-interactions":
+        serve_interactions(args.host, args.port, args.workers)
+        return
+
+    guild_id = args.guild or legacy_guild_id()
+    if guild_id == "0":
+        sys.exit("❌ Pass --guild: GUILD_ID isn't set and more than one guild is configured")
+    if args.command == "import-scores":
+        if STORAGE_BACKEND != 'sqlite':
+            print("⚠️ JSON backend: stop the bot first or it will overwrite these changes on its next flush")
+        with open(args.file, 'r', encoding='utf-8-sig') as f:
+            try:
+                adjustments = parse_adjustments(f.read(), file_format(args.file))
+            except ValueError as e:
+                sys.exit(f"❌ Could not read {args.file}: {e}")
+        print(f"✅ Applied {store.apply_adjustments(guild_id, adjustments)} point changes from {args.file} to guild {guild_id}")
+    else:
+        with open(args.file, 'w', encoding='utf-8', newline='') as f:
+            export_scores(f, args.format or file_format(args.file), guild_id)
+        print(f"✅ Exported guild {guild_id}'s scores to {args.file}")
+
+def main():
+    if len(sys.argv) > 1:
+        run_cli(sys.argv[1:])
+        return
+    if not TOKEN:
+        raise RuntimeError("❌ DISCORD_BOT_TOKEN not set!")
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    client.run(TOKEN)
+    io_executor.shutdown(wait=True)
+    store.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,768 @@
+# Offline simulation of a full question-of-the-day round.
+# Drives the real handlers in main.py (post_question, AnswerModal/AnonModal, VotingView votes,
+# end of voting, /score, /leaderboard, /history and /myanswers) against fake Discord objects
+# with N synthetic users, then reports throughput, p50/p99 latency per handler and storage I/O counts.
+#
+#   python simulate.py --users 500 --backend sqlite
+#   python simulate.py --users 50 --stress 5000    # plus concurrent point changes, checked exactly
+#   python simulate.py --users 500 --transport http --http-workers 4
+#   python simulate.py --memory 10000                # per-answer memory of a round's records
+#   python simulate.py --submit-bench 2000           # submits/s: per-click file rewrite vs resident store
+#   python simulate.py --users 500 --vote-render-interval 2 --vote-spread 10   # tally edit coalescing
+#   python simulate.py --users 50 --schedule-days 2   # whole days through the scheduler, no sleeping
+#
+# With --transport http the members' clicks, modals and commands are sent as signed interaction
+# payloads to `main.py serve-interactions` workers on a local port (signed with a throwaway key),
+# while this process plays the gateway side: the schedule, following the journals and
+# answering the admin commands the workers relay.
+#
+# Everything runs in a throwaway directory, so the real questions/scores files are never touched.
+
+import argparse
+import asyncio
+import builtins
+import datetime
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Simulate question-of-the-day rounds without Discord")
+    p.add_argument("--users", type=int, default=20, help="synthetic members answering")
+    p.add_argument("--anon-ratio", type=float, default=0.1, help="share of answers sent anonymously")
+    p.add_argument("--submitters", type=int, default=5, help="members submitting a question")
+    p.add_argument("--rounds", type=int, default=1)
+    p.add_argument("--backend", choices=["sqlite", "json"], default="sqlite")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--stress", type=int, default=0, help="concurrent admin point changes fired after the rounds")
+    p.add_argument("--transport", choices=["gateway", "http"], default="gateway", help="how interactions reach the handlers")
+    p.add_argument("--http-workers", type=int, default=4)
+    p.add_argument("--vote-render-interval", type=float, default=0, help="seconds between voting-message edits (the bot's default is 2)")
+    p.add_argument("--vote-spread", type=float, default=0, help="spread the votes over this many seconds instead of one burst")
+    p.add_argument("--schedule-days", type=int, default=0, help="days to drive through the phase scheduler on a simulated clock")
+    p.add_argument("--submit-bench", type=int, default=0, help="answer submissions for the per-click vs resident score store benchmark")
+    p.add_argument("--memory", type=int, default=0, help="answers and votes held for the per-answer memory benchmark")
+    return p.parse_args()
+
+args = parse_args()
+random.seed(args.seed)
+if args.schedule_days and args.transport == "http":
+    sys.exit("❌ --schedule-days runs the members in-process; use --transport gateway")
+if args.transport == "http":
+    if args.backend != "sqlite":
+        sys.exit("❌ The HTTP workers need --backend sqlite")
+    import aiohttp
+    from nacl.signing import SigningKey
+    signing_key = SigningKey.generate()
+    os.environ["DISCORD_PUBLIC_KEY"] = signing_key.verify_key.encode().hex()
+    os.environ["INTERACTIONS_MODE"] = "http"
+
+workdir = tempfile.mkdtemp(prefix="qotd-sim-")
+shutil.copy(os.path.join(HERE, "questions.json"), workdir)
+os.chdir(workdir)
+os.environ["STORAGE_BACKEND"] = args.backend
+os.environ["VOTE_RENDER_INTERVAL"] = str(args.vote_render_interval)
+os.environ["ANSWER_DIGEST_INTERVAL"] = "0"
+os.environ.pop("NOTIFY_USER_ID", None)
+sys.path.insert(0, HERE)
+
+io_counts = Counter()
+real_open = builtins.open
+
+def counting_open(file, *a, **kw):
+    io_counts["file_open"] += 1
+    return real_open(file, *a, **kw)
+
+import discord
+import main
+
+# ------- FAKE DISCORD OBJECTS -------
+
+snowflakes = itertools.count(discord.utils.time_snowflake(discord.utils.utcnow()))
+api_calls = Counter()
+channels = {}  # id -> FakeChannel, threads included, served through client.get_channel
+
+class FakeUser:
+    def __init__(self, uid, name):
+        self.id = uid
+        self.name = name
+        self.display_name = name
+        self.global_name = name
+        self.discriminator = "0"
+        self.mention = f"<@{uid}>"
+        self.bot = False
+        self.guild_permissions = discord.Permissions.none()
+
+    async def send(self, content=None, **kwargs):
+        api_calls["dm"] += 1
+
+class FakeGuild:
+    def __init__(self, gid):
+        self.id = gid
+
+class FakeMessage:
+    def __init__(self, channel, content, view, author):
+        self.id = next(snowflakes)
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+        self.view = view
+        self.author = author
+        self.edits = 0
+
+    async def edit(self, content=None, view=None, **kwargs):
+        api_calls["edit"] += 1
+        self.edits += 1
+        if content is not None:
+            self.content = content
+
+    async def delete(self):
+        api_calls["delete"] += 1
+        self.channel.messages.pop(self.id, None)
+
+    async def pin(self):
+        api_calls["pin"] += 1
+
+    async def create_thread(self, name, **kwargs):
+        api_calls["create_thread"] += 1
+        return FakeChannel(next(snowflakes), self.guild, thread=True)
+
+class FakeChannel:
+    def __init__(self, cid, guild, thread=False):
+        self.id = cid
+        self.guild = guild
+        self.mention = f"<#{cid}>"
+        self.messages = {}
+        self.thread = thread
+        channels[cid] = self
+
+    async def send(self, content=None, view=None, author=None, **kwargs):
+        api_calls["thread_send" if self.thread else "send"] += 1
+        msg = FakeMessage(self, content, view, author or bot_user)
+        self.messages[msg.id] = msg
+        await main.on_message(msg)
+        return msg
+
+    def get_partial_message(self, message_id):
+        return self.messages.get(message_id) or FakeMessage(self, None, None, bot_user)
+
+    async def delete_messages(self, messages):
+        api_calls["bulk_delete"] += 1
+        for m in messages:
+            self.messages.pop(m.id, None)
+
+    async def purge(self, limit=100, **kwargs):
+        api_calls["purge"] += 1
+        self.messages.clear()
+
+    async def edit(self, **kwargs):
+        api_calls["thread_archive" if kwargs.get("archived") else "channel_edit"] += 1
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def send_message(self, content=None, ephemeral=False, **kwargs):
+        self.done = True
+        self.interaction.sent_view = kwargs.get("view")
+        if not ephemeral:
+            await self.interaction.channel.send(content, author=bot_user)
+
+    async def send_modal(self, modal):
+        self.done = True
+        self.interaction.modal = modal
+
+    async def defer(self, **kwargs):
+        self.done = True
+
+    async def edit_message(self, **kwargs):
+        # The ephemeral ballot, not a channel message: counted apart from the tally edits
+        self.done = True
+        api_calls["interaction_edit"] += 1
+
+class FakeInteraction:
+    def __init__(self, user, guild, channel, message=None):
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = channel
+        self.message = message
+        self.modal = None
+        self.sent_view = None
+        self.response = FakeResponse(self)
+        # discord.py dispatches on_interaction for every interaction before the handler runs
+        main.member_cache.remember(guild.id, user)
+
+bot_user = FakeUser(1, "QOTD Bot")
+
+# ------- MEASUREMENT -------
+
+timings = defaultdict(list)
+errors = Counter()
+bursts = []  # (name, interactions, wall seconds)
+
+async def timed(name, coro):
+    start = time.perf_counter()
+    try:
+        await coro
+    except Exception as e:
+        if not errors[name]:
+            print(f"⚠️ {name} raised {type(e).__name__}: {e}")
+        errors[name] += 1
+    timings[name].append(time.perf_counter() - start)
+
+async def burst(name, coros):
+    # Wall-clock rate of a batch of concurrent interactions: the number to compare across transports
+    before = sum(map(len, timings.values()))
+    start = time.perf_counter()
+    await asyncio.gather(*coros)
+    bursts.append((name, sum(map(len, timings.values())) - before, time.perf_counter() - start))
+
+async def settle_tally(gr, votes):
+    # Let the pending coalesced render finish, then compare voting-message edits with votes cast
+    view = gr.voting_view
+    if view.render_task:
+        await view.render_task
+    print(f"🗳️ {votes} votes cast, {gr.voting_message.edits} voting-message edits (VOTE_RENDER_INTERVAL={main.VOTE_RENDER_INTERVAL:g}s)")
+
+def fill(text_input, value):
+    text_input._value = value
+
+def report(elapsed):
+    print(f"\n{'handler':<28}{'calls':>7}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>11}")
+    for name, samples in timings.items():
+        samples = sorted(samples)
+        p50 = samples[len(samples) // 2] * 1000
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+        rate = len(samples) / sum(samples) if sum(samples) else float("inf")
+        print(f"{name:<28}{len(samples):>7}{errors[name]:>8}{p50:>10.2f}{p99:>10.2f}{rate:>11.0f}")
+    print()
+    for name, count, seconds in bursts:
+        print(f"{name:<28}{count:>7} interactions in {seconds:.2f} s ({count / seconds:.0f}/s)")
+    print(f"\nstorage I/O: {dict(io_counts)}")
+    print(f"Discord API calls: {dict(api_calls)}")
+    print(f"member cache: {main.member_cache.hits} hits, {main.member_cache.misses} misses")
+    print(f"send queue: {main.metrics.counters.get(('qotd_send_coalesced_total', None), 0)} lines merged into earlier messages")
+    transport = f"http transport, {args.http_workers} workers" if args.transport == "http" else "gateway transport"
+    print(f"loop lag max: {main.loop_lag['max'] * 1000:.1f} ms, wall time: {elapsed:.2f} s ({args.backend} backend, {transport}, {args.users} users)")
+
+# ------- HTTP TRANSPORT -------
+
+http = {}  # "url", "session"
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_workers():
+    # Forked before this process opens the store or starts its I/O thread
+    port = free_port()
+    server = multiprocessing.get_context("fork").Process(target=main.serve_interactions, args=("127.0.0.1", port, args.http_workers))
+    server.start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    http["url"] = f"http://127.0.0.1:{port}{main.HTTP_PATH}"
+    return server
+
+async def post_signed(body, timestamp=None, signature=None):
+    raw = json.dumps(body).encode()
+    timestamp = timestamp or str(int(time.time()))
+    signature = signature or signing_key.sign(timestamp.encode() + raw).signature.hex()
+    headers = {"Content-Type": "application/json", "X-Signature-Ed25519": signature, "X-Signature-Timestamp": timestamp}
+    async with http["session"].post(http["url"], data=raw, headers=headers) as r:
+        if r.status != 200:
+            raise RuntimeError(f"HTTP {r.status}")
+        return await r.json()
+
+async def interact(name, kind, user, guild, data):
+    # -> the interaction response, timed under name like the gateway handler it stands for
+    body = {
+        "id": str(next(snowflakes)), "application_id": "1", "type": kind, "token": "fake", "version": 1,
+        "guild_id": str(guild.id), "channel_id": "2000", "data": data,
+        "member": {
+            "user": {"id": str(user.id), "username": user.name, "global_name": user.name},
+            "nick": None, "permissions": str(user.guild_permissions.value),
+        },
+    }
+    start = time.perf_counter()
+    try:
+        return await post_signed(body)
+    except Exception as e:
+        if not errors[name]:
+            print(f"⚠️ {name} raised {type(e).__name__}: {e}")
+        errors[name] += 1
+    finally:
+        timings[name].append(time.perf_counter() - start)
+
+def command(name, **options):
+    return {"name": name, "type": 1, "options": [{"name": k, "type": 3, "value": v} for k, v in options.items()]}
+
+def modal_submit(modal, value):
+    text_input = modal["components"][0]["components"][0]
+    return {"custom_id": modal["custom_id"], "components": [{"type": 1, "components": [{"type": 4, "custom_id": text_input["custom_id"], "value": value}]}]}
+
+def first_component(reply):
+    return reply["data"]["components"][0]["components"][0]
+
+async def check_signature_rejected(guild):
+    body = {"id": "1", "type": main.PING, "guild_id": str(guild.id)}
+    try:
+        await post_signed(body, signature="00" * 64)
+    except RuntimeError as e:
+        print(f"🔏 Forged signature rejected ({e})")
+        return
+    print("⚠️ A forged signature was accepted")
+
+async def http_answer(gr, guild, channel, question_msg, user, anonymous):
+    custom_id = "qotd:answer:anon" if anonymous else "qotd:answer:free"
+    reply = await interact("QuestionView.click", main.MESSAGE_COMPONENT, user, guild, {"custom_id": custom_id, "component_type": 2})
+    if not reply or reply["type"] != main.MODAL:
+        return
+    name = "AnonModal.on_submit" if anonymous else "AnswerModal.on_submit"
+    await interact(name, main.MODAL_SUBMIT, user, guild, modal_submit(reply["data"], f"Answer from {user.display_name}"))
+
+async def http_submit(guild, channel, user):
+    reply = await interact("/submitquestion", main.APPLICATION_COMMAND, user, guild, command("submitquestion"))
+    if reply and reply["type"] == main.MODAL:
+        await interact("SubmitModal.on_submit", main.MODAL_SUBMIT, user, guild, modal_submit(reply["data"], f"What would {user.display_name} ask?"))
+
+async def http_vote(gr, guild, channel, user):
+    choices = [idx for idx, uid in enumerate(gr.voting_view.uids) if uid != user.id]
+    if not choices:
+        return
+    reply = await interact("OpenBallotButton.callback", main.MESSAGE_COMPONENT, user, guild, {"custom_id": "qotd:ballot:open", "component_type": 2})
+    idx = random.choice(choices)
+    page = idx // main.BALLOT_PAGE_SIZE
+    if reply and page:
+        reply = await interact("BallotPageButton.callback", main.MESSAGE_COMPONENT, user, guild, {"custom_id": f"qotd:ballot:page:{page}", "component_type": 2})
+    if reply:
+        select = first_component(reply)
+        await interact("BallotSelect.callback", main.MESSAGE_COMPONENT, user, guild, {"custom_id": select["custom_id"], "component_type": 3, "values": [str(idx)]})
+
+async def http_leaderboard_page(guild, channel, user):
+    reply = await interact("/leaderboard", main.APPLICATION_COMMAND, user, guild, command("leaderboard"))
+    if reply:
+        data = {"custom_id": first_component(reply)["custom_id"], "component_type": 3, "values": [random.choice(main.LEADERBOARD_CATEGORIES)]}
+        await interact("CategorySelect.callback", main.MESSAGE_COMPONENT, user, guild, data)
+
+class FakeHook:
+    # Stands in for the webhook the gateway answers a relayed command through
+    def __init__(self):
+        self.messages = []
+
+    async def edit_message(self, message_id, content=None, **kwargs):
+        self.messages.append(content)
+
+    async def send(self, content=None, **kwargs):
+        self.messages.append(content)
+
+relayed_hooks = {}  # interaction id -> FakeHook
+
+def fake_relayed_interaction(payload):
+    inter = main.HttpInteraction(payload)
+    hook = relayed_hooks[inter.id] = FakeHook()
+    inter.response = main.RelayedResponse(hook)
+    inter.followup = hook
+    return inter
+
+async def http_admin(gr, guild, channel):
+    # /questionlist pages through custom-id state; queue and file commands are deferred by the
+    # worker and answered by this process once it picks them off the command relay
+    admin = FakeUser(9_999, "admin")
+    admin.guild_permissions = discord.Permissions(administrator=True)
+    footers = []
+    reply = await interact("/questionlist", main.APPLICATION_COMMAND, admin, guild, command("questionlist", status="all"))
+    for button in (1, 0):  # Next, then Previous
+        if not reply:
+            break
+        footers.append(reply["data"]["embeds"][0]["footer"]["text"])
+        custom_id = reply["data"]["components"][0]["components"][button]["custom_id"]
+        reply = await interact("QuestionListView.update_message", main.MESSAGE_COMPONENT, admin, guild, {"custom_id": custom_id, "component_type": 2})
+    if reply:
+        footers.append(reply["data"]["embeds"][0]["footer"]["text"])
+    assert [f.split(" of ")[0] for f in footers] == ["Page 1", "Page 2", "Page 1"], f"question list paging: {footers}"
+
+    main.relayed_interaction = fake_relayed_interaction
+    relayed_hooks.clear()
+    qid = str(main.store.question_count())
+    deferred = [
+        await interact("/pinquestion", main.APPLICATION_COMMAND, admin, guild, command("pinquestion", question_id=qid)),
+        await interact("/exportscores", main.APPLICATION_COMMAND, admin, guild, command("exportscores", format="csv")),
+    ]
+    assert all(r and r["type"] == main.DEFERRED_MESSAGE for r in deferred), f"relayed commands weren't deferred: {deferred}"
+    await timed("relay_commands", main.command_relay.forward())
+    await asyncio.gather(*main.command_relay.running)
+    answered = [m for hook in relayed_hooks.values() for m in hook.messages]
+    assert int(qid) in main.question_queue.guild(guild.id)["pinned"], "the relayed /pinquestion didn't reach the queue"
+    print(f"🛂 Paged the question list ({' → '.join(f.split(' · ')[0] for f in footers)}), relayed {len(answered)} admin replies: {answered}")
+
+async def http_round(gr, guild, channel, users):
+    await timed("purge", main.purge_tracked(gr))
+    await timed("notify", main.notify_guild(gr))
+    await timed("post_question", main.post_question(gr))
+    if gr.question_message_id is None:
+        print("⚠️ No question was posted; the bank is empty")
+        return
+
+    await burst("answers + submissions", [
+        *(http_answer(gr, guild, channel, None, u, random.random() < args.anon_ratio) for u in users),
+        *(http_submit(guild, channel, u) for u in users[:args.submitters]),
+    ])
+    await burst("/score", [interact("/score", main.APPLICATION_COMMAND, u, guild, command("score")) for u in users])
+
+    # The scheduler follows the journal before every phase; the workers' answers arrive here
+    await timed("follow", gr.follow())
+    await timed("warning", main.warn_guild(gr))
+    await timed("close_submissions", main.close_guild_submissions(gr))
+    await timed("start_voting", main.open_voting(gr))
+    if gr.voting_view:
+        await burst("votes", [http_vote(gr, guild, channel, u) for u in users])
+    await burst("leaderboard", [http_leaderboard_page(guild, channel, u) for u in users[:50]])
+    await timed("follow", gr.follow())
+    followed = len(gr.voting_view.user_votes) if gr.voting_view else 0
+    if gr.voting_view:
+        await settle_tally(gr, followed)
+    pending = sum(map(len, main.admin_digest.pending.values()))
+    await timed("relay_notices", main.notice_relay.forward())
+    relayed = sum(map(len, main.admin_digest.pending.values())) - pending
+    await timed("end_voting", main.close_voting(gr))
+    await timed("flush", main.run_io(main.store.flush))
+    await timed("admin_digest", main.admin_digest.flush())
+    await interact("/history", main.APPLICATION_COMMAND, users[0], guild, command("history", day=gr.day))
+    await asyncio.gather(*(interact("/myanswers", main.APPLICATION_COMMAND, u, guild, command("myanswers")) for u in users[:50]))
+    await http_admin(gr, guild, channel)
+    print(f"📒 Followed {len(gr.answer_log)} answers and {followed} votes from the workers' journal lines, relayed {relayed} admin notices")
+
+# ------- ROUND -------
+
+async def answer(gr, guild, channel, question_msg, user, anonymous):
+    inter = FakeInteraction(user, guild, channel, question_msg)
+    button = question_msg.view.anon if anonymous else question_msg.view.freely
+    await timed("QuestionView.click", button.callback(inter))
+    modal = inter.modal
+    fill(modal.answer, f"Answer from {user.display_name}")
+    name = "AnonModal.on_submit" if anonymous else "AnswerModal.on_submit"
+    await timed(name, modal.on_submit(FakeInteraction(user, guild, channel)))
+
+async def submit(guild, channel, user):
+    modal = main.SubmitModal(user)
+    fill(modal.q, f"What would {user.display_name} ask?")
+    await timed("SubmitModal.on_submit", modal.on_submit(FakeInteraction(user, guild, channel)))
+
+async def vote(gr, guild, channel, user):
+    if args.vote_spread:
+        await asyncio.sleep(random.uniform(0, args.vote_spread))
+    view = gr.voting_view
+    choices = [idx for idx, uid in enumerate(view.uids) if uid != user.id]
+    if not choices:
+        return
+    inter = FakeInteraction(user, guild, channel, gr.voting_message)
+    await timed("OpenBallotButton.callback", view.children[0].callback(inter))
+    ballot = inter.sent_view
+
+    # Turn to the page holding a random answer (one page click stands in for however many it
+    # takes), then pick the answer from that page's select menu
+    idx = random.choice(choices)
+    page = idx // main.BALLOT_PAGE_SIZE
+    if ballot.page != page:
+        nav = ballot.children[2 if ballot.page < page else 1]
+        nav.page = page
+        await timed("BallotPageButton.callback", nav.callback(FakeInteraction(user, guild, channel)))
+        ballot = main.BallotView(view, page)
+    select = ballot.children[0]
+    select._values = [str(idx)]
+    await timed("BallotSelect.callback", select.callback(FakeInteraction(user, guild, channel)))
+
+async def leaderboard_page(guild, channel, user):
+    select = main.CategorySelect(None)
+    select._values = [random.choice(main.LEADERBOARD_CATEGORIES)]
+    await timed("CategorySelect.callback", select.callback(FakeInteraction(user, guild, channel)))
+
+async def run_round(gr, guild, channel, users):
+    await timed("purge", main.purge_tracked(gr))
+    await timed("notify", main.notify_guild(gr))
+    await timed("post_question", main.post_question(gr))
+    question_msg = channel.messages.get(gr.question_message_id)
+    if not question_msg:
+        print("⚠️ No question was posted; the bank is empty")
+        return
+
+    await burst("answers + submissions", [
+        *(answer(gr, guild, channel, question_msg, u, random.random() < args.anon_ratio) for u in users),
+        *(submit(guild, channel, u) for u in users[:args.submitters]),
+    ])
+    await burst("/score", [timed("/score", main.score.callback(FakeInteraction(u, guild, channel))) for u in users])
+
+    await timed("warning", main.warn_guild(gr))
+    await timed("close_submissions", main.close_guild_submissions(gr))
+    await timed("start_voting", main.open_voting(gr))
+    if gr.voting_view:
+        cast = len(timings["BallotSelect.callback"])
+        await burst("votes", [vote(gr, guild, channel, u) for u in users])
+        await settle_tally(gr, len(timings["BallotSelect.callback"]) - cast)
+    await burst("leaderboard", [leaderboard_page(guild, channel, u) for u in users[:50]])
+    await timed("end_voting", main.close_voting(gr))
+    await timed("flush", main.run_io(main.store.flush))
+    await timed("admin_digest", main.admin_digest.flush())
+    await timed("/history", main.history.callback(FakeInteraction(users[0], guild, channel), gr.day))
+    await asyncio.gather(*(timed("/myanswers", main.my_answers.callback(FakeInteraction(u, guild, channel))) for u in users[:50]))
+
+async def stress(guild, channel, users):
+    # Every change goes in at once against a few hot users, through both the admin commands and
+    # the store directly; afterwards the store and the leaderboard index must hold the exact sums
+    admin = FakeUser(9_999, "admin")
+    admin.guild_permissions = discord.Permissions(administrator=True)
+    hot = users[:5]
+    before = {u.id: await main.run_io(main.store.get, guild.id, str(u.id)) for u in hot}
+    expected = {u.id: [s["insight_points"], s["contribution_points"]] for u, s in zip(hot, before.values())}
+    changes = []
+    for _ in range(args.stress):
+        user, amount, insight = random.choice(hot), random.randint(1, 3), random.random() < 0.5
+        expected[user.id][0 if insight else 1] += amount
+        kind = random.choice(("command", "store"))
+        if kind == "command":
+            command = main.add_insight if insight else main.add_contrib
+            changes.append(timed(f"/{command.name}", command.callback(FakeInteraction(admin, guild, channel), user, amount)))
+        else:
+            changes.append(timed("store.increment", main.run_io(main.store.increment, guild.id, user.id, *((amount, 0) if insight else (0, amount)))))
+    await asyncio.gather(*changes)
+
+    lost = 0
+    for user in hot:
+        s = await main.run_io(main.store.get, guild.id, str(user.id))
+        got = [s["insight_points"], s["contribution_points"]]
+        indexed = list(main.guild_leaderboard(guild.id).points.get(str(user.id), (0, 0)))
+        if got != expected[user.id] or indexed != expected[user.id]:
+            lost += 1
+            print(f"⚠️ {user.display_name}: expected {expected[user.id]}, store {got}, leaderboard {indexed}")
+    print(f"stress: {args.stress} concurrent point changes, {lost} users with lost updates")
+    assert not lost, f"{lost} users lost point changes"
+
+# ------- SCHEDULE -------
+# --schedule-days hands the phase scheduler a SimulatedClock and lets run_until jump from one due
+# phase to the next for two guilds in different time zones, starting the day before Europe leaves
+# DST. Members answer after each post and vote once voting opens. Every phase has to fire exactly
+# once per local day, at its local wall-clock time.
+
+SCHEDULE_START = datetime.datetime(2026, 10, 24, tzinfo=datetime.timezone.utc)  # Berlin: CEST -> CET on the 25th
+SCHEDULE_ZONES = ("Europe/Berlin", "America/New_York")
+
+async def schedule_run(users):
+    sched = main.scheduler
+    clock = main.SimulatedClock(SCHEDULE_START)
+    real_clock, sched.clock = sched.clock, clock
+    sched.sem = asyncio.Semaphore(main.GUILD_CONCURRENCY)
+    phases = dict(main.PHASES)
+    places = {}  # guild id -> (guild, channel)
+    fired = []  # (guild id, phase, UTC time)
+
+    def step(phase, fn):
+        async def run(gr):
+            fired.append((gr.guild_id, phase, clock.now()))
+            guild, channel = places[gr.guild_id]
+            # Phases are minutes to hours apart in simulated time, but the send pacing window is real time
+            main.send_queue.sent.pop(channel.id, None)
+            await timed(f"phase:{phase}", fn(gr))
+            if phase == "post" and gr.question_message_id:
+                question_msg = channel.messages.get(gr.question_message_id)
+                await asyncio.gather(*(answer(gr, guild, channel, question_msg, u, random.random() < args.anon_ratio) for u in users))
+            elif phase == "start_voting" and gr.voting_view:
+                await asyncio.gather(*(vote(gr, guild, channel, u) for u in users))
+        return run
+
+    for phase, (at, fn) in phases.items():
+        main.PHASES[phase] = (at, step(phase, fn))
+    for n, zone in enumerate(SCHEDULE_ZONES):
+        guild = FakeGuild(3000 + n)
+        channel, admin_channel = FakeChannel(4000 + 2 * n, guild), FakeChannel(4001 + 2 * n, guild)
+        gr = main.guild_rounds[guild.id] = main.GuildRound(guild.id, channel.id, admin_channel.id, zone)
+        main.question_queue.guild(guild.id)["cursor"] = 0
+        places[guild.id] = (guild, channel)
+        sched.schedule_guild(gr, catch_up=False)
+
+    start = time.perf_counter()
+    try:
+        await sched.run_until(SCHEDULE_START + datetime.timedelta(days=args.schedule_days))
+    finally:
+        main.PHASES.update(phases)
+        sched.clock = real_clock
+    elapsed = time.perf_counter() - start
+
+    runs = Counter()
+    posts = defaultdict(list)
+    mistimed = 0
+    for guild_id, phase, at in fired:
+        gr = main.guild_rounds[guild_id]
+        local = at.astimezone(gr.tz)
+        runs[(guild_id, phase, local.date())] += 1
+        if local.time() != phases[phase][0]:
+            mistimed += 1
+            print(f"⚠️ {phase} fired at {local:%H:%M} local in {gr.timezone}, expected {phases[phase][0]:%H:%M}")
+        if phase == "post":
+            posts[gr.timezone].append(f"{at:%m-%d %H:%M}")
+    expected = len(SCHEDULE_ZONES) * len(phases) * args.schedule_days
+    repeated = sum(1 for count in runs.values() if count > 1)
+    for zone, times in posts.items():
+        print(f"🕛 {zone}: questions posted at {', '.join(times)} UTC")
+    print(f"schedule: {len(fired)}/{expected} phases fired, {repeated} repeated, {args.schedule_days} days in {elapsed:.2f} s")
+    assert len(fired) == expected and not repeated and not mistimed, "the scheduler missed, repeated or mistimed a phase"
+
+# ------- SUBMIT BENCHMARK -------
+# --submit-bench N: N answers against a scores file that already holds N members. "before" is
+# the bot's original path, which loaded the whole file, changed one entry and rewrote it on
+# every click; "after" is the resident JsonStore (first load included), written once by a flush.
+
+def legacy_submit(path, uid, qid):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            scores = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        scores = {}
+    s = scores.setdefault(uid, {"insight_points": 0, "contribution_points": 0, "answered": []})
+    if qid not in s["answered"]:
+        s["insight_points"] += 1
+        s["answered"].append(qid)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(scores, f, indent=2)
+
+def submit_benchmark(n):
+    members = [str(20_000 + i) for i in range(n)]
+    seed = {uid: {"insight_points": 3, "contribution_points": 1, "answered": [1, 2, 3], "last_contrib": None} for uid in members}
+    rates = {}
+    for name in ("before", "after"):
+        path = f"bench_{name}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(seed if name == "before" else {"1": seed}, f, indent=2)
+        start = time.perf_counter()
+        if name == "before":
+            for uid in members:
+                legacy_submit(path, uid, 4)
+        else:
+            bench_store = main.JsonStore(path)
+            for uid in members:
+                bench_store.record_answer("1", uid, 4)
+            bench_store.flush()
+        rates[name] = n / (time.perf_counter() - start)
+        with open(path, 'r', encoding='utf-8') as f:
+            scores = json.load(f) if name == "before" else json.load(f)["1"]
+            assert all(s["insight_points"] == 4 for s in scores.values()), f"{name}: lost a submit"
+    print(f"submits: {n} answers on a {n}-member scores file, {rates['before']:.0f}/s before, {rates['after']:.0f}/s after ({rates['after'] / rates['before']:.0f}x)")
+
+# ------- MEMORY -------
+# What a day's round keeps per answer: the answer log, the ballot and one vote per member.
+# Answer texts and names are allocated before tracing starts, so only the records are counted.
+# "before" rebuilds the earlier layout (a dict per answer keyed by string id, a tuple per ballot
+# entry, string-keyed vote dicts) next to the real AnswerRecord/VotingView one.
+
+def legacy_round(members):
+    answer_log = {str(uid): {"answer": text, "name": name, "anonymous": False} for uid, name, text in members}
+    ballot = [(uid, data["name"], data["answer"]) for uid, data in answer_log.items()]
+    vote_counts, user_votes = {}, {}
+    for voter, _, _ in members:
+        idx = (voter + 1) % len(ballot)
+        user_votes[str(voter)] = idx
+        vote_counts[idx] = vote_counts.get(idx, 0) + 1
+    return answer_log, ballot, vote_counts, user_votes
+
+def compact_round(members):
+    gr = main.GuildRound(0, 0)
+    for uid, name, text in members:
+        gr.answer_log[uid] = main.AnswerRecord(text, name, False)
+    view = gr.voting_view = main.VotingView([(uid, record.answer) for uid, record in gr.answer_log.items()], gr)
+    for voter, _, _ in members:
+        view.cast(voter, (voter + 1) % len(view.answers))
+    return gr
+
+def traced(build, members):
+    tracemalloc.start()
+    kept = build(members)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+def memory_benchmark(n):
+    # Ids in the snowflake range, as Discord's are
+    members = [(800_000_000_000_000_000 + i, f"user{i}", f"answer number {i}") for i in range(n)]
+    before, after = traced(legacy_round, members), traced(compact_round, members)
+    print(f"memory: {n} answers + {n} votes, {before / n:.0f} B/answer before, {after / n:.0f} B/answer after ({after / before:.0%})")
+
+async def simulate():
+    main.bot_loop = asyncio.get_running_loop()
+    guild = FakeGuild(1000)
+    channel = FakeChannel(2000, guild)
+    admin_channel = FakeChannel(2001, guild)
+    main.client.get_channel = channels.get
+    main.client.get_guild = {guild.id: guild}.get
+
+    users = [FakeUser(10_000 + i, f"user{i}") for i in range(args.users)]
+
+    await main.run_io(main.store.load)
+    await main.ensure_leaderboard(guild.id)
+    await main.load_guilds()
+    await main.run_io(main.admin_digest.load)
+    await main.run_io(main.notice_relay.load)
+    await main.run_io(main.command_relay.load)
+    gr = main.guild_rounds[guild.id] = main.GuildRound(guild.id, channel.id, admin_channel.id)
+    await main.run_io(main.save_guild_config)  # HTTP workers find the guild here
+    main.question_queue.guild(guild.id)["cursor"] = 0
+    if args.backend == "sqlite":
+        main.store.db.set_trace_callback(lambda stmt: io_counts.update(["sql_statement"]))
+    main.measure_loop_lag.start()
+
+    if args.transport == "http":
+        http["session"] = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.http_workers * 8))
+        await check_signature_rejected(guild)
+    play_round = http_round if args.transport == "http" else run_round
+
+    builtins.open = counting_open
+    start = time.perf_counter()
+    try:
+        for _ in range(args.rounds):
+            await play_round(gr, guild, channel, users)
+        if args.stress:
+            await stress(guild, channel, users)
+        if args.schedule_days:
+            await schedule_run(users)
+        if args.memory:
+            memory_benchmark(args.memory)
+    finally:
+        builtins.open = real_open
+        if "session" in http:
+            await http["session"].close()
+    elapsed = time.perf_counter() - start
+    main.measure_loop_lag.cancel()
+    report(elapsed)
+    if args.submit_bench:
+        submit_benchmark(args.submit_bench)
+
+if __name__ == "__main__":
+    server = start_workers() if args.transport == "http" else None
+    try:
+        asyncio.run(simulate())
+    finally:
+        if server:
+            server.terminate()
+            server.join()
+        main.io_executor.shutdown(wait=True)
+        shutil.rmtree(workdir, ignore_errors=True)